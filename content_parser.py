@@ -10,11 +10,26 @@ from collections import namedtuple
 
 FormatSpec = namedtuple("FormatSpec", ["key", "fmt", "decoding"])
 
+V0_CIPHERTEXT_LENGTH = struct.Struct("<i")
+
+V1_FORMAT_SPEC = (
+    FormatSpec(key="len_ciphertext", fmt=struct.Struct("<H"), decoding=None),
+    FormatSpec(key="len_device_id", fmt=struct.Struct("<B"), decoding=None),
+    FormatSpec(key="platform_shortcode", fmt=1, decoding="ascii"),
+    FormatSpec(key="ciphertext", fmt=lambda d: d["len_ciphertext"], decoding=None),
+    FormatSpec(key="device_id", fmt=lambda d: d["len_device_id"], decoding=None),
+    FormatSpec(key="language", fmt=2, decoding="ascii"),
+)
+
 
 def parse_payload(payload: bytes, format_spec: list) -> dict:
     """
     Parses a binary payload based on the provided format specification.
 
+    A field's ``fmt`` is a byte count, a :class:`struct.Struct`, a struct
+    format string, or a callable returning one of those from the values parsed
+    so far.
+
     Args:
         payload (bytes): The binary data to parse.
         format_spec (list[FormatSpec]): List of FormatSpec named tuples defining parsing rules.
@@ -28,14 +43,19 @@ def parse_payload(payload: bytes, format_spec: list) -> dict:
     for spec in format_spec:
         fmt = spec.fmt(result) if callable(spec.fmt) else spec.fmt
         if isinstance(fmt, int):
-            fmt = f"{fmt}s"
-
-        size = struct.calcsize(fmt)
-        if offset + size > total_len:
-            break
-
-        (value,) = struct.unpack_from(fmt, payload, offset)
-        offset += size
+            if fmt < 0:
+                raise ValueError(f"Invalid length {fmt} for field '{spec.key}'.")
+            if offset + fmt > total_len:
+                break
+            value = bytes(payload[offset : offset + fmt])
+            offset += fmt
+        else:
+            if isinstance(fmt, str):
+                fmt = struct.Struct(fmt)
+            if offset + fmt.size > total_len:
+                break
+            (value,) = fmt.unpack_from(payload, offset)
+            offset += fmt.size
 
         if spec.decoding and isinstance(value, (bytes, bytearray)):
             value = value.decode(spec.decoding)
@@ -60,7 +80,7 @@ def decode_v0(payload: bytes) -> tuple:
         tuple: A dictionary of parsed values and an optional error.
     """
     parsers = [
-        FormatSpec(key="len_ciphertext", fmt="<i", decoding=None),
+        FormatSpec(key="len_ciphertext", fmt=V0_CIPHERTEXT_LENGTH, decoding=None),
         FormatSpec(key="platform_shortcode", fmt=1, decoding="ascii"),
         FormatSpec(key="ciphertext", fmt=lambda d: d["len_ciphertext"], decoding=None),
         FormatSpec(
@@ -87,17 +107,9 @@ def decode_v1(payload: bytes) -> tuple:
         tuple: A dictionary of parsed values and an optional error.
     """
     version = f"v{payload[0]}"
-    parsers = [
-        FormatSpec(key="len_ciphertext", fmt="<H", decoding=None),
-        FormatSpec(key="len_device_id", fmt="<B", decoding=None),
-        FormatSpec(key="platform_shortcode", fmt=1, decoding="ascii"),
-        FormatSpec(key="ciphertext", fmt=lambda d: d["len_ciphertext"], decoding=None),
-        FormatSpec(key="device_id", fmt=lambda d: d["len_device_id"], decoding=None),
-        FormatSpec(key="language", fmt=2, decoding="ascii"),
-    ]
 
     try:
-        result = parse_payload(payload[1:], parsers)
+        result = parse_payload(memoryview(payload)[1:], V1_FORMAT_SPEC)
         result["version"] = version
         return result, None
     except Exception as e:
@@ -349,7 +361,7 @@ def is_v0_payload(payload):
             return False
 
         # Extract the first 4 bytes as a little-endian integer (ciphertext length)
-        ciphertext_length = struct.unpack("<i", payload[:4])[0]
+        (ciphertext_length,) = V0_CIPHERTEXT_LENGTH.unpack_from(payload)
 
         # Ensure ciphertext_length is non-negative
         if ciphertext_length < 0:
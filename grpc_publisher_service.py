@@ -1,12 +1,21 @@
 """gRPC Publisher Service"""
 
-import datetime
-import base64
-import traceback
-import json
+import asyncio
+import binascii
+import hashlib
+import operator
+import threading
+import time
+import queue
+import random
+from collections import namedtuple
+from concurrent.futures import Future
+from types import MappingProxyType
 import grpc
+import orjson
 
 import sentry_sdk
+from cachetools import TLRUCache, TTLCache
 
 import publisher_pb2
 import publisher_pb2_grpc
@@ -23,8 +32,9 @@ from grpc_vault_entity_client import (
     store_entity_token,
     get_entity_access_token,
     decrypt_payload,
-    update_entity_token,
+    update_entity_token_future,
     delete_entity_token,
+    delete_entity_token_future,
 )
 from notification_dispatcher import dispatch_notifications
 from logutils import get_logger
@@ -36,9 +46,529 @@ MOCK_DELIVERY_SMS = (
     get_configs("MOCK_DELIVERY_SMS", default_value="true") or ""
 ).lower() == "true"
 
+PUBLISH_IDEMPOTENCY_TTL = int(
+    get_configs("PUBLISH_IDEMPOTENCY_TTL", default_value="120")
+)
+
+# Requests of one PublishContentStream that may be handled at the same time.
+STREAM_MAX_IN_FLIGHT = int(get_configs("STREAM_MAX_IN_FLIGHT", default_value="8"))
+
+# Access tokens fetched from the vault can be reused for TOKEN_CACHE_TTL
+# seconds. Off by default, since tokens changed by another publisher instance
+# are only seen once the cached entry expires.
+TOKEN_CACHE_ENABLED = (
+    get_configs("TOKEN_CACHE_ENABLED", default_value="false") or ""
+).lower() == "true"
+TOKEN_CACHE_TTL = int(get_configs("TOKEN_CACHE_TTL", default_value="300"))
+# Fraction of TOKEN_CACHE_TTL randomly taken off each entry's lifetime, so
+# tokens cached at the same moment do not all expire together.
+TOKEN_CACHE_JITTER = float(get_configs("TOKEN_CACHE_JITTER", default_value="0.1"))
+
 logger = get_logger(__name__)
 loc = Localization()
-t = loc.translate
+
+_PUBLISH_IDEMPOTENCY = TTLCache(maxsize=50_000, ttl=PUBLISH_IDEMPOTENCY_TTL)
+_PUBLISH_IDEMPOTENCY_LOCK = threading.Lock()
+
+
+def access_token_expiry(_key, _token, now):
+    """Expiry time of a cached access token, with TOKEN_CACHE_JITTER applied."""
+    return now + TOKEN_CACHE_TTL * (1 - random.uniform(0, TOKEN_CACHE_JITTER))
+
+
+_ACCESS_TOKENS = TLRUCache(maxsize=1024, ttu=access_token_expiry, timer=time.monotonic)
+_ACCESS_TOKENS_LOCK = threading.Lock()
+_STRIP_NEWLINES = str.maketrans("", "", "\n")
+# Notification timestamps are epoch seconds rendered in UTC.
+DATE_FMT = "%Y-%m-%d %H:%M:%S (UTC)"
+
+PublicationContext = namedtuple("PublicationContext", ["country_code", "language"])
+DecryptedPayload = namedtuple("DecryptedPayload", ["payload_plaintext", "country_code"])
+# Outcome of a publication handler: a ready response to return, an error to
+# report, or the adapter's success message and any refresh alert for the sender.
+PublicationResult = namedtuple(
+    "PublicationResult",
+    ["response", "error", "message", "refresh_alert"],
+    defaults=(None, None, None, None),
+)
+PublicationNotification = namedtuple(
+    "PublicationNotification",
+    [
+        "platform_name",
+        "publication_ctx",
+        "status",
+        "additional_data",
+        "phone_number",
+        "timestamp",
+    ],
+)
+
+NOTIFY_BATCH_SIZE = int(get_configs("NOTIFY_BATCH_SIZE", default_value="64"))
+# Seconds to wait for more notifications to join a batch after the first.
+NOTIFY_BATCH_WINDOW = float(get_configs("NOTIFY_BATCH_WINDOW", default_value="0.02"))
+_NOTIFY_Q = queue.Queue(maxsize=4096)
+_NOTIFY_DISPATCH_LOCK = threading.Lock()
+_DELIVERY_TEMPLATES = {}
+
+_PUBLICATION_EVENT = MappingProxyType(
+    {"notification_type": "event", "target": "publication"}
+)
+# With MOCK_DELIVERY_SMS the delivery message is reported to Sentry instead of
+# being sent to the sender by SMS.
+_DELIVERY_NOTIFICATION = MappingProxyType(
+    {
+        "notification_type": "event",
+        "target": "sentry",
+        "details": MappingProxyType({"level": "info", "capture_type": "message"}),
+    }
+    if MOCK_DELIVERY_SMS
+    else {"notification_type": "sms"}
+)
+_DELIVERY_TARGET = _DELIVERY_NOTIFICATION.get("target")
+
+# Content extractors for versioned payloads. Unversioned (v0) payloads are
+# extracted from the decoded plaintext instead.
+CONTENT_EXTRACTORS = {"v1": extract_content_v1, "v2": extract_content_v2}
+
+OAUTH2_URL_REQUIRED_FIELDS = ("platform",)
+OAUTH2_EXCHANGE_REQUIRED_FIELDS = ("long_lived_token", "platform", "authorization_code")
+OAUTH2_REVOKE_REQUIRED_FIELDS = ("long_lived_token", "platform", "account_identifier")
+PUBLISH_REQUIRED_FIELDS = ("content",)
+PUBLISH_REQUIRED_METADATA = ("From",)
+PNBA_CODE_REQUIRED_FIELDS = ("phone_number", "platform")
+PNBA_EXCHANGE_REQUIRED_FIELDS = (
+    "long_lived_token",
+    "phone_number",
+    "platform",
+    "authorization_code",
+)
+PNBA_REVOKE_REQUIRED_FIELDS = ("long_lived_token", "platform", "account_identifier")
+OAUTH2_URL_OPTIONAL_FIELDS = (
+    "state",
+    "code_verifier",
+    "redirect_url",
+    "request_identifier",
+)
+OAUTH2_EXCHANGE_OPTIONAL_FIELDS = (
+    "code_verifier",
+    "redirect_url",
+    "request_identifier",
+)
+PNBA_EXCHANGE_OPTIONAL_FIELDS = ("password", "request_identifier")
+OAUTH2_URL_RESULT_FIELDS = (
+    "authorization_url",
+    "state",
+    "code_verifier",
+    "client_id",
+    "scope",
+    "redirect_url",
+)
+
+
+_FIELD_GETTERS = {}
+
+
+def get_field_getter(fields):
+    """Get a cached getter returning the values of ``fields`` as a tuple.
+
+    Args:
+        fields (tuple[str]): The field names to read.
+
+    Returns:
+        callable: A function taking a request and returning a tuple of values.
+    """
+    getter = _FIELD_GETTERS.get(fields)
+    if getter is None:
+        if len(fields) == 1:
+            get_value = operator.attrgetter(fields[0])
+
+            def getter(request):
+                return (get_value(request),)
+
+        else:
+            getter = operator.attrgetter(*fields)
+        _FIELD_GETTERS[fields] = getter
+    return getter
+
+
+def read_optional_fields(request, fields):
+    """Read optional request fields, mapping empty values to None.
+
+    Args:
+        request (protobuf message): The incoming request.
+        fields (tuple[str]): The field names to read.
+
+    Returns:
+        dict: Field names mapped to their values, or None when unset.
+    """
+    values = get_field_getter(fields)(request)
+    return {field: value or None for field, value in zip(fields, values)}
+
+
+def build_delivery_template(language, status):
+    """Build the delivery message template for a locale and publication status.
+
+    Args:
+        language (str): The language code.
+        status (str): The publication status ("failed" or "published").
+
+    Returns:
+        str: A template with ``platform_name``, ``timestamp`` and
+            ``additional_data`` placeholders.
+
+    Raises:
+        ValueError: If the language is not available.
+        KeyError: If the language is missing a delivery message key.
+    """
+    delivery_status = loc.get_compiled(
+        "delivery_status_failed" if status == "failed" else "delivery_status_success",
+        language,
+    )
+    return loc.get_compiled("sms_delivery_message", language).replace(
+        "{delivery_status}", delivery_status
+    )
+
+
+def get_delivery_template(language, status):
+    """Get the delivery message template for a locale and publication status.
+
+    The delivery status is substituted once per (language, status) pair, leaving
+    only the per-message fields to format. Locales that are unavailable or
+    missing a delivery key use the English template, which is cached for them
+    so the missing key is only logged once.
+
+    Args:
+        language (str): The language code.
+        status (str): The publication status ("failed" or "published").
+
+    Returns:
+        str: A template with ``platform_name``, ``timestamp`` and
+            ``additional_data`` placeholders.
+
+    Raises:
+        ValueError: If English is not available.
+        KeyError: If English is missing a delivery message key.
+    """
+    template = _DELIVERY_TEMPLATES.get((language, status))
+    if template is None:
+        try:
+            template = build_delivery_template(language, status)
+        except (KeyError, ValueError) as e:
+            if language == "en":
+                raise
+            logger.error("Falling back to English for '%s': %s", language, e)
+            template = get_delivery_template("en", status)
+        _DELIVERY_TEMPLATES[(language, status)] = template
+    return template
+
+
+def preload_delivery_templates():
+    """Build the delivery templates of every available locale ahead of time.
+
+    Locales missing a delivery key are resolved to the English template.
+    """
+    loc.preload()
+    for language in loc.config.sections():
+        for status in ("failed", "published"):
+            try:
+                get_delivery_template(language, status)
+            except KeyError as e:
+                logger.warning("Skipping delivery template preload: %s", e)
+
+
+def handle_publication_notifications_batch(batch):
+    """Build and dispatch the notifications for a batch of publications.
+
+    Args:
+        batch (list[PublicationNotification]): Publication outcomes to report.
+    """
+    notifications = []
+    # Publications in a batch mostly share the same second.
+    timestamps = {}
+    for item in batch:
+        # A malformed item is skipped rather than losing the rest of the batch.
+        try:
+            second = int(item.timestamp)
+            timestamp = timestamps.get(second)
+            if timestamp is None:
+                timestamp = timestamps[second] = time.strftime(
+                    DATE_FMT, time.gmtime(second)
+                )
+
+            template = get_delivery_template(
+                item.publication_ctx.language or "en", item.status
+            )
+            message = template.format_map(
+                {
+                    "additional_data": item.additional_data or "",
+                    "platform_name": item.platform_name,
+                    "timestamp": timestamp,
+                }
+            )
+            publication_event = {
+                **_PUBLICATION_EVENT,
+                "details": {
+                    "platform_name": item.platform_name,
+                    "source": "platforms",
+                    "status": item.status,
+                    "country_code": item.publication_ctx.country_code,
+                },
+            }
+        except Exception:
+            logger.exception(
+                "Failed to build the notifications for a %s publication.",
+                item.platform_name,
+            )
+            continue
+
+        notifications.append(publication_event)
+        notifications.append(
+            {
+                **_DELIVERY_NOTIFICATION,
+                "target": _DELIVERY_TARGET or item.phone_number,
+                "message": message,
+            }
+        )
+    dispatch_notifications(notifications)
+
+
+def dispatch_queued_notifications():
+    """Wait for a queued notification and dispatch it in a batch.
+
+    Notifications queued within NOTIFY_BATCH_WINDOW of the first join its
+    batch, up to NOTIFY_BATCH_SIZE. Each is marked done once dispatched.
+    """
+    batch = [_NOTIFY_Q.get()]
+    try:
+        with _NOTIFY_DISPATCH_LOCK:
+            deadline = time.monotonic() + NOTIFY_BATCH_WINDOW
+            while len(batch) < NOTIFY_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(_NOTIFY_Q.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                handle_publication_notifications_batch(batch)
+            except Exception:
+                logger.exception("Failed to dispatch publication notifications.")
+    finally:
+        for _ in batch:
+            _NOTIFY_Q.task_done()
+
+
+def _notification_worker():
+    """Drain the notification queue, dispatching up to NOTIFY_BATCH_SIZE at a time."""
+    while True:
+        dispatch_queued_notifications()
+
+
+def flush_publication_notifications():
+    """Dispatch every queued notification, waiting for any batch in flight.
+
+    Called on shutdown so queued notifications are not lost with the
+    notifier thread.
+    """
+    with _NOTIFY_DISPATCH_LOCK:
+        batch = []
+        while True:
+            try:
+                batch.append(_NOTIFY_Q.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            for start in range(0, len(batch), NOTIFY_BATCH_SIZE):
+                handle_publication_notifications_batch(
+                    batch[start : start + NOTIFY_BATCH_SIZE]
+                )
+        finally:
+            for _ in batch:
+                _NOTIFY_Q.task_done()
+    # The notifier thread may have taken a notification off the queue before
+    # the lock was free; wait until it has been dispatched too.
+    _NOTIFY_Q.join()
+
+
+threading.Thread(
+    target=_notification_worker, name="publication-notifier", daemon=True
+).start()
+
+
+def dumps_token(token):
+    """Serialize a token for storage in the vault.
+
+    Args:
+        token (Any): The JSON-serializable token.
+
+    Returns:
+        str: The JSON-encoded token.
+    """
+    return orjson.dumps(token).decode("utf-8")
+
+
+def get_cached_access_token(platform, account_identifier, device_id, phone_number):
+    """Get a cached vault access token, if token caching is enabled.
+
+    Args:
+        platform (str): The platform name.
+        account_identifier (str): The account identifier.
+        device_id (str): The ID of the device, if any.
+        phone_number (str): The sender's phone number, if any.
+
+    Returns:
+        str | None: The cached token, or None on a miss.
+    """
+    if not TOKEN_CACHE_ENABLED:
+        return None
+    key = (platform.lower(), account_identifier, device_id, phone_number)
+    with _ACCESS_TOKENS_LOCK:
+        return _ACCESS_TOKENS.get(key)
+
+
+def cache_access_token(platform, account_identifier, device_id, phone_number, token):
+    """Cache a vault access token, if token caching is enabled."""
+    if not TOKEN_CACHE_ENABLED:
+        return
+    key = (platform.lower(), account_identifier, device_id, phone_number)
+    with _ACCESS_TOKENS_LOCK:
+        _ACCESS_TOKENS[key] = token
+
+
+def invalidate_cached_access_tokens(platform, account_identifier):
+    """Drop every cached access token for an account.
+
+    Called once the vault has replaced, updated or deleted the account's
+    stored token, so the next publication reads the new state from the vault.
+    Invalidating before the write lands would let a concurrent lookup
+    re-cache the stale token.
+
+    Args:
+        platform (str): The platform name.
+        account_identifier (str): The account identifier.
+    """
+    if not TOKEN_CACHE_ENABLED:
+        return
+    account = (platform.lower(), account_identifier)
+    with _ACCESS_TOKENS_LOCK:
+        for key in [key for key in _ACCESS_TOKENS if key[:2] == account]:
+            _ACCESS_TOKENS.pop(key, None)
+
+
+def claim_publication(idempotency_key):
+    """Claim a publication, or get the response of an identical one.
+
+    The first caller for a key records an in-flight marker and publishes.
+    Identical requests arriving meanwhile wait on that marker instead of
+    publishing again, and retry the claim if the publication fails.
+
+    Args:
+        idempotency_key (tuple): The content digest and sender's phone number.
+
+    Returns:
+        tuple:
+            - Future | None: The claimed marker, to pass to release_publication().
+            - PublishContentResponse | None: A copy of the earlier response.
+    """
+    while True:
+        with _PUBLISH_IDEMPOTENCY_LOCK:
+            publication = _PUBLISH_IDEMPOTENCY.get(idempotency_key)
+            if publication is None:
+                publication = _PUBLISH_IDEMPOTENCY[idempotency_key] = Future()
+                return publication, None
+        published = publication.result()
+        if published is not None:
+            return None, publisher_pb2.PublishContentResponse.FromString(published)
+
+
+def release_publication(idempotency_key, publication, publish_response=None):
+    """Resolve a claimed publication and wake the requests waiting on it.
+
+    Args:
+        idempotency_key (tuple): The key passed to claim_publication().
+        publication (Future): The claimed marker.
+        publish_response (PublishContentResponse | None): The successful
+            response to replay, or None if the publication failed.
+    """
+    if publish_response is None:
+        with _PUBLISH_IDEMPOTENCY_LOCK:
+            if _PUBLISH_IDEMPOTENCY.get(idempotency_key) is publication:
+                del _PUBLISH_IDEMPOTENCY[idempotency_key]
+        publication.set_result(None)
+        return
+    publication.set_result(publish_response.SerializeToString())
+
+
+def loads_token(token):
+    """Parse a token returned by the vault.
+
+    Args:
+        token (str): The JSON-encoded token.
+
+    Returns:
+        Any: The decoded token.
+    """
+    return orjson.loads(token)
+
+
+class RecordedStatusContext:
+    """Records the status a handler sets instead of applying it directly.
+
+    Used for each request of a stream, where setting a status code on the
+    stream's own context would end the whole stream, and for handlers run
+    off the event loop, whose status is applied back on the loop.
+    """
+
+    __slots__ = ("wrapped_context", "_code", "_details")
+
+    def __init__(self, wrapped_context):
+        self.wrapped_context = wrapped_context
+        self._code = None
+        self._details = None
+
+    def set_code(self, code):
+        """Record the status code for this request."""
+        self._code = code
+
+    def set_details(self, details):
+        """Record the status details for this request."""
+        self._details = details
+
+    def code(self):
+        """Return the recorded status code, if any."""
+        return self._code
+
+    def details(self):
+        """Return the recorded status details, if any."""
+        return self._details
+
+    def apply(self):
+        """Apply the recorded status to the wrapped context."""
+        if self._code is not None:
+            self.wrapped_context.set_code(self._code)
+        if self._details is not None:
+            self.wrapped_context.set_details(self._details)
+
+    def __getattr__(self, name):
+        return getattr(self.wrapped_context, name)
+
+
+def stream_item_response(publish_response, item_context):
+    """Turn a failed stream item into a response instead of a stream error.
+
+    Args:
+        publish_response (PublishContentResponse): The handler's response.
+        item_context (RecordedStatusContext): The item's recorded status.
+
+    Returns:
+        PublishContentResponse: The response to yield for this item.
+    """
+    if item_context.code() not in (None, grpc.StatusCode.OK):
+        return publisher_pb2.PublishContentResponse(
+            success=False, message=item_context.details()
+        )
+    return publish_response
 
 
 class PublisherService(publisher_pb2_grpc.PublisherServicer):
@@ -78,155 +608,155 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
             An instance of the specified response with the error set.
         """
         user_msg = user_msg or str(error)
+        details = f"{error_prefix}: {user_msg}" if error_prefix else user_msg
 
         if error_type == "UNKNOWN" and isinstance(error, Exception):
-            traceback.print_exception(type(error), error, error.__traceback__)
+            logger.error(
+                "%s",
+                details,
+                exc_info=(type(error), error, error.__traceback__),
+            )
             if send_to_sentry:
                 sentry_sdk.capture_exception(error)
         elif send_to_sentry:
             sentry_sdk.capture_message(user_msg, level="error")
 
-        context.set_details(f"{error_prefix}: {user_msg}" if error_prefix else user_msg)
+        context.set_details(details)
         context.set_code(status_code)
 
         return response()
 
-    def handle_request_field_validation(
-        self, context, request, response, required_fields
-    ):
+    def handle_unsupported_platform(self, context, response, platform_name, protocol):
         """
-        Validates the fields in the gRPC request.
+        Handles a request for a platform that has no adapter for the protocol.
 
         Args:
-            context: gRPC context.
-            request: gRPC request object.
-            response: gRPC response object.
-            required_fields (list): List of required fields, can include tuples.
+            context (grpc.ServicerContext): The gRPC context object.
+            response (callable): The gRPC response object.
+            platform_name (str): The requested platform name.
+            protocol (str): The protocol the request requires.
 
         Returns:
-            None or response: None if no missing fields,
-                error response otherwise.
+            An instance of the specified response with the error set.
+        """
+        return self.handle_create_grpc_error_response(
+            context,
+            response,
+            f"The platform '{platform_name}' with "
+            f"protocol '{protocol}' is currently not supported. "
+            "Please contact the developers for more information on when "
+            "this platform will be implemented.",
+            grpc.StatusCode.UNIMPLEMENTED,
+        )
+
+    def handle_rpc_exception(self, context, response, exc, send_to_sentry=False):
         """
+        Handles an exception raised while serving an RPC.
 
-        def validate_field(field):
-            if not getattr(request, field, None):
-                return self.handle_create_grpc_error_response(
-                    context,
-                    response,
-                    f"Missing required field: {field}",
-                    grpc.StatusCode.INVALID_ARGUMENT,
-                )
+        NotImplementedError is reported as UNIMPLEMENTED with its own message.
+        Anything else is logged with its traceback and reported as INTERNAL
+        with a generic message.
 
-            return None
+        Args:
+            context (grpc.ServicerContext): The gRPC context object.
+            response (callable): The gRPC response object.
+            exc (Exception): The exception raised by the handler.
+            send_to_sentry (bool): If set to True, unexpected errors are sent to
+                Sentry for tracking.
 
-        for field in required_fields:
-            validation_error = validate_field(field)
-            if validation_error:
-                return validation_error
+        Returns:
+            An instance of the specified response with the error set.
+        """
+        if isinstance(exc, NotImplementedError):
+            return self.handle_create_grpc_error_response(
+                context,
+                response,
+                str(exc),
+                grpc.StatusCode.UNIMPLEMENTED,
+            )
 
-        return None
+        return self.handle_create_grpc_error_response(
+            context,
+            response,
+            exc,
+            grpc.StatusCode.INTERNAL,
+            user_msg="Oops! Something went wrong. Please try again later.",
+            error_type="UNKNOWN",
+            send_to_sentry=send_to_sentry,
+        )
 
-    def create_token_update_handler(self, response_cls, grpc_context, **kwargs):
+    def handle_request_field_validation(
+        self, context, request, response, required_fields, required_metadata=()
+    ):
         """
-        Creates a function to handle updating the token for a specific device and account.
+        Validates the fields in the gRPC request.
 
         Args:
-            device_id (str): The unique identifier of the device.
-            account_id (str): The identifier for the account (e.g., email or username).
-            platform (str): The name of the platform (e.g., 'gmail').
-            response_cls (protobuf message class): The response class for the gRPC method.
-            grpc_context (grpc.ServicerContext): The gRPC context for the current method call.
+            context: gRPC context.
+            request: gRPC request object.
+            response: gRPC response object.
+            required_fields (tuple): Names of the required fields.
+            required_metadata (tuple): Keys required in the request's metadata.
 
         Returns:
-            function: A function `handle_token_update(token)` that updates the token information.
+            None or response: None if no missing fields,
+                error response otherwise.
         """
-        device_id = kwargs.get("device_id")
-        phone_number = kwargs.get("phone_number")
-        account_id = kwargs["account_id"]
-        platform = kwargs["platform"]
-        skip_token_update = kwargs["skip_token_update"]
-
-        def handle_token_update(token, **kwargs):
-            """
-            Handles updating the stored token for the specified device and account.
-
-            Args:
-                token (dict or object): The token information containing access and refresh tokens.
-            """
-            logger.debug(kwargs)
-            if skip_token_update:
-                logger.debug("Skipping token update for %s on %s", account_id, platform)
-                return True
-
-            update_response, update_error = update_entity_token(
-                device_id=device_id,
-                phone_number=phone_number,
-                token=json.dumps(token),
-                account_identifier=account_id,
-                platform=platform,
+        required_fields = tuple(required_fields)
+        values = get_field_getter(required_fields)(request)
+        missing = next(
+            (field for field, value in zip(required_fields, values) if not value),
+            None,
+        )
+        if missing is None and required_metadata:
+            metadata = request.metadata
+            missing = next(
+                (
+                    f"metadata.{key}"
+                    for key in required_metadata
+                    if not metadata.get(key)
+                ),
+                None,
             )
+        if missing is None:
+            return None
 
-            if update_error:
-                return self.handle_create_grpc_error_response(
-                    grpc_context,
-                    response_cls,
-                    update_error.details(),
-                    update_error.code(),
-                )
-
-            if not update_response.success:
-                return response_cls(
-                    message=update_response.message,
-                    success=update_response.success,
-                )
-
-            return True
-
-        return handle_token_update
+        return self.handle_create_grpc_error_response(
+            context,
+            response,
+            f"Missing required field: {missing}",
+            grpc.StatusCode.INVALID_ARGUMENT,
+        )
 
     def GetOAuth2AuthorizationUrl(self, request, context):
         """Handles generating OAuth2 authorization URL"""
 
         response = publisher_pb2.GetOAuth2AuthorizationUrlResponse
 
-        def validate_fields():
-            return self.handle_request_field_validation(
-                context,
-                request,
-                response,
-                ["platform"],
-            )
-
         try:
-            invalid_fields_response = validate_fields()
+            invalid_fields_response = self.handle_request_field_validation(
+                context, request, response, OAUTH2_URL_REQUIRED_FIELDS
+            )
             if invalid_fields_response:
                 return invalid_fields_response
 
+            platform_name = request.platform.lower()
             adapter = AdapterManager.get_adapter_path(
-                name=request.platform.lower(), protocol="oauth2"
+                name=platform_name, protocol="oauth2"
             )
             if not adapter:
-                raise NotImplementedError(
-                    f"The platform '{request.platform.lower()}' with "
-                    "protocol 'oauth2' is currently not supported. "
-                    "Please contact the developers for more information on when "
-                    "this platform will be implemented."
+                return self.handle_unsupported_platform(
+                    context, response, platform_name, "oauth2"
                 )
 
-            params = {
-                "state": getattr(request, "state") or None,
-                "code_verifier": getattr(request, "code_verifier") or None,
-                "autogenerate_code_verifier": getattr(
-                    request, "autogenerate_code_verifier"
-                ),
-                "redirect_url": getattr(request, "redirect_url") or None,
-                "request_identifier": getattr(request, "request_identifier") or None,
-                "base_path": adapter["assets_path"],
-            }
+            params = read_optional_fields(request, OAUTH2_URL_OPTIONAL_FIELDS)
+            params["autogenerate_code_verifier"] = request.autogenerate_code_verifier
+            params["base_path"] = adapter["assets_path"]
 
             pipe = AdapterIPCHandler.invoke(
                 adapter_path=adapter["path"],
                 venv_path=adapter["venv_path"],
+                persistent_worker=adapter["persistent_worker"],
                 method="get_authorization_url",
                 params=params,
             )
@@ -243,46 +773,22 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
             result = pipe.get("result")
 
             return response(
-                authorization_url=result.get("authorization_url"),
-                state=result.get("state"),
-                code_verifier=result.get("code_verifier"),
-                client_id=result.get("client_id"),
-                scope=result.get("scope"),
-                redirect_url=result.get("redirect_url"),
                 message="Successfully generated authorization url",
-            )
-
-        except NotImplementedError as e:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                str(e),
-                grpc.StatusCode.UNIMPLEMENTED,
+                **{
+                    field: result[field]
+                    for field in OAUTH2_URL_RESULT_FIELDS
+                    if result.get(field) is not None
+                },
             )
 
         except Exception as exc:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                exc,
-                grpc.StatusCode.INTERNAL,
-                user_msg="Oops! Something went wrong. Please try again later.",
-                error_type="UNKNOWN",
-            )
+            return self.handle_rpc_exception(context, response, exc)
 
     def ExchangeOAuth2CodeAndStore(self, request, context):
         """Handles exchanging OAuth2 authorization code for a token"""
 
         response = publisher_pb2.ExchangeOAuth2CodeAndStoreResponse
 
-        def validate_fields():
-            return self.handle_request_field_validation(
-                context,
-                request,
-                response,
-                ["long_lived_token", "platform", "authorization_code"],
-            )
-
         def list_tokens():
             list_response, list_error = list_entity_stored_tokens(
                 long_lived_token=request.long_lived_token
@@ -311,7 +817,7 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                 long_lived_token=request.long_lived_token,
                 platform=request.platform,
                 account_identifier=userinfo.get("account_identifier"),
-                token=json.dumps(token),
+                token=dumps_token(token),
             )
 
             if store_error:
@@ -328,6 +834,9 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                     message=store_response.message, success=store_response.success
                 )
 
+            invalidate_cached_access_tokens(
+                request.platform, userinfo.get("account_identifier")
+            )
             return response(
                 success=True,
                 message="Successfully fetched and stored token",
@@ -335,36 +844,35 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
             )
 
         try:
-            invalid_fields_response = validate_fields()
+            invalid_fields_response = self.handle_request_field_validation(
+                context, request, response, OAUTH2_EXCHANGE_REQUIRED_FIELDS
+            )
             if invalid_fields_response:
                 return invalid_fields_response
 
+            platform_name = request.platform.lower()
             adapter = AdapterManager.get_adapter_path(
-                name=request.platform.lower(), protocol="oauth2"
+                name=platform_name, protocol="oauth2"
             )
             if not adapter:
-                raise NotImplementedError(
-                    f"The platform '{request.platform.lower()}' with "
-                    "protocol 'oauth2' is currently not supported. "
-                    "Please contact the developers for more information on when "
-                    "this platform will be implemented."
+                return self.handle_unsupported_platform(
+                    context, response, platform_name, "oauth2"
                 )
 
+            # The listing authenticates the long-lived token, so it has to
+            # finish before the adapter exchanges the code.
             _, token_list_error = list_tokens()
             if token_list_error:
                 return token_list_error
 
-            params = {
-                "code": request.authorization_code,
-                "code_verifier": getattr(request, "code_verifier") or None,
-                "redirect_url": getattr(request, "redirect_url") or None,
-                "request_identifier": getattr(request, "request_identifier") or None,
-                "base_path": adapter["assets_path"],
-            }
+            params = read_optional_fields(request, OAUTH2_EXCHANGE_OPTIONAL_FIELDS)
+            params["code"] = request.authorization_code
+            params["base_path"] = adapter["assets_path"]
 
             pipe = AdapterIPCHandler.invoke(
                 adapter_path=adapter["path"],
                 venv_path=adapter["venv_path"],
+                persistent_worker=adapter["persistent_worker"],
                 method="exchange_code_and_fetch_user_info",
                 params=params,
             )
@@ -384,37 +892,14 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                 token=result.get("token"), userinfo=result.get("userinfo")
             )
 
-        except NotImplementedError as e:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                str(e),
-                grpc.StatusCode.UNIMPLEMENTED,
-            )
-
         except Exception as exc:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                exc,
-                grpc.StatusCode.INTERNAL,
-                user_msg="Oops! Something went wrong. Please try again later.",
-                error_type="UNKNOWN",
-            )
+            return self.handle_rpc_exception(context, response, exc)
 
     def RevokeAndDeleteOAuth2Token(self, request, context):
         """Handles revoking and deleting OAuth2 access tokens"""
 
         response = publisher_pb2.RevokeAndDeleteOAuth2TokenResponse
 
-        def validate_fields():
-            return self.handle_request_field_validation(
-                context,
-                request,
-                response,
-                ["long_lived_token", "platform", "account_identifier"],
-            )
-
         def get_access_token():
             get_access_token_response, get_access_token_error = get_entity_access_token(
                 platform=request.platform,
@@ -454,33 +939,37 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                     success=delete_token_response.success,
                 )
 
+            invalidate_cached_access_tokens(
+                request.platform, request.account_identifier
+            )
             return response(success=True, message="Successfully deleted token")
 
         try:
-            invalid_fields_response = validate_fields()
+            invalid_fields_response = self.handle_request_field_validation(
+                context, request, response, OAUTH2_REVOKE_REQUIRED_FIELDS
+            )
             if invalid_fields_response:
                 return invalid_fields_response
 
+            platform_name = request.platform.lower()
             adapter = AdapterManager.get_adapter_path(
-                name=request.platform.lower(), protocol="oauth2"
+                name=platform_name, protocol="oauth2"
             )
             if not adapter:
-                raise NotImplementedError(
-                    f"The platform '{request.platform.lower()}' with "
-                    "protocol 'oauth2' is currently not supported. "
-                    "Please contact the developers for more information on when "
-                    "this platform will be implemented."
+                return self.handle_unsupported_platform(
+                    context, response, platform_name, "oauth2"
                 )
 
             access_token, access_token_error = get_access_token()
             if access_token_error:
                 return access_token_error
 
-            params = {"token": json.loads(access_token)}
+            params = {"token": loads_token(access_token)}
 
             pipe = AdapterIPCHandler.invoke(
                 adapter_path=adapter["path"],
                 venv_path=adapter["venv_path"],
+                persistent_worker=adapter["persistent_worker"],
                 method="revoke_token",
                 params=params,
             )
@@ -490,34 +979,14 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
 
             return delete_token()
 
-        except NotImplementedError as e:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                str(e),
-                grpc.StatusCode.UNIMPLEMENTED,
-            )
-
         except Exception as exc:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                exc,
-                grpc.StatusCode.INTERNAL,
-                user_msg="Oops! Something went wrong. Please try again later.",
-                error_type="UNKNOWN",
-            )
+            return self.handle_rpc_exception(context, response, exc)
 
     def PublishContent(self, request, context):
         """Handles publishing relaysms payload"""
 
         response = publisher_pb2.PublishContentResponse
 
-        def validate_fields():
-            return self.handle_request_field_validation(
-                context, request, response, ["content"]
-            )
-
         def decode_payload():
             decoded_result, decode_error = decode_content(request.content)
             if decode_error:
@@ -547,6 +1016,12 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
         def get_access_token(
             device_id, phone_number, platform_name, account_identifier
         ):
+            cached_token = get_cached_access_token(
+                platform_name, account_identifier, device_id, phone_number
+            )
+            if cached_token is not None:
+                return cached_token, None
+
             get_access_token_response, get_access_token_error = get_entity_access_token(
                 device_id=device_id,
                 phone_number=phone_number,
@@ -567,13 +1042,20 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                     message=get_access_token_response.message,
                     success=get_access_token_response.success,
                 )
+            cache_access_token(
+                platform_name,
+                account_identifier,
+                device_id,
+                phone_number,
+                get_access_token_response.token,
+            )
             return get_access_token_response.token, None
 
         def decrypt_message(device_id, phone_number, encrypted_content):
             decrypt_payload_response, decrypt_payload_error = decrypt_payload(
                 device_id=device_id,
                 phone_number=phone_number,
-                payload_ciphertext=base64.b64encode(encrypted_content).decode("utf-8"),
+                payload_ciphertext=encrypted_content,
             )
             if decrypt_payload_error:
                 return None, self.handle_create_grpc_error_response(
@@ -591,21 +1073,21 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                     success=decrypt_payload_response.success,
                 )
 
-            result = {
-                "payload_plaintext": base64.b64decode(
+            result = DecryptedPayload(
+                payload_plaintext=binascii.a2b_base64(
                     decrypt_payload_response.payload_plaintext
                 ),
-                "country_code": decrypt_payload_response.country_code,
-            }
+                country_code=decrypt_payload_response.country_code,
+            )
             return result, None
 
         def handle_token_update(
             token, device_id, phone_number, account_identifier, platform
         ):
-            update_response, update_error = update_entity_token(
+            update_future, update_error = update_entity_token_future(
                 device_id=device_id,
                 phone_number=phone_number,
-                token=json.dumps(token),
+                token=dumps_token(token),
                 account_identifier=account_identifier,
                 platform=platform,
             )
@@ -616,59 +1098,75 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                     update_error.code(),
                     update_error.details(),
                 )
-                return False
+                return
+
+            def handle_update_outcome(future):
+                try:
+                    update_response = future.result()
+                except grpc.RpcError as update_error:
+                    logger.error(
+                        "Failed to update token: %s - %s",
+                        update_error.code(),
+                        update_error.details(),
+                    )
+                    return
+
+                if not update_response.success:
+                    logger.error("Failed to update token: %s", update_response.message)
+                    return
 
-            if not update_response.success:
-                logger.error("Failed to update token: %s", update_response.message)
-                return False
+                invalidate_cached_access_tokens(platform, account_identifier)
 
-            return True
+            update_future.add_done_callback(handle_update_outcome)
 
         def handle_oauth2_publication(
             service_type, platform_name, content_parts, **kwargs
         ):
-            service_handlers = {
-                "email": lambda parts: {
-                    "sender_id": parts[0],
-                    "from_email": parts[0],
-                    "to_email": parts[1],
-                    "cc_email": parts[2],
-                    "bcc_email": parts[3],
-                    "subject": parts[4],
-                    "message": parts[5],
-                    "access_token": parts[6],
-                    "refresh_token": parts[7],
-                },
-                "text": lambda parts: {
-                    "sender_id": parts[0],
-                    "message": parts[1],
-                    "access_token": parts[2],
-                    "refresh_token": parts[3],
-                },
-                "message": lambda parts: {
-                    "sender_id": parts[0],
-                    "recipient": parts[1],
-                    "message": parts[2],
-                    "access_token": parts[3],
-                    "refresh_token": parts[4],
-                },
-            }
-
-            if service_type not in service_handlers:
+            if service_type == "email":
+                (
+                    sender_id,
+                    to_email,
+                    cc_email,
+                    bcc_email,
+                    subject,
+                    message,
+                    access_token,
+                    refresh_token,
+                ) = content_parts[:8]
+                message_params = {
+                    "sender_id": sender_id,
+                    "from_email": sender_id,
+                    "to_email": to_email,
+                    "cc_email": cc_email,
+                    "bcc_email": bcc_email,
+                    "subject": subject,
+                    "message": message,
+                }
+            elif service_type == "text":
+                sender_id, message, access_token, refresh_token = content_parts[:4]
+                message_params = {"sender_id": sender_id, "message": message}
+            elif service_type == "message":
+                sender_id, recipient, message, access_token, refresh_token = (
+                    content_parts[:5]
+                )
+                message_params = {
+                    "sender_id": sender_id,
+                    "recipient": recipient,
+                    "message": message,
+                }
+            else:
                 raise NotImplementedError(
                     f"The service type '{service_type}' for '{platform_name}' "
                     "is not supported. Please contact the developers for more information."
                 )
 
-            data = service_handlers[service_type](content_parts)
-            user_sent_tokens = bool(data["access_token"] and data["refresh_token"])
+            user_sent_tokens = bool(access_token and refresh_token)
 
-            adapter = AdapterManager.get_adapter_path(
-                name=platform_name.lower(), protocol="oauth2"
-            )
+            platform = platform_name.lower()
+            adapter = AdapterManager.get_adapter_path(name=platform, protocol="oauth2")
             if not adapter:
                 raise NotImplementedError(
-                    f"The platform '{platform_name.lower()}' with "
+                    f"The platform '{platform}' with "
                     "protocol 'oauth2' is currently not supported. "
                     "Please contact the developers for more information on when "
                     "this platform will be implemented."
@@ -676,95 +1174,77 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
 
             token, token_error = get_access_token(
                 device_id=kwargs.get("device_id"),
-                phone_number=request.metadata["From"],
+                phone_number=sender_phone_number,
                 platform_name=platform_info["name"],
-                account_identifier=data["sender_id"],
+                account_identifier=sender_id,
             )
             if token_error:
-                return {"response": token_error, "error": None, "message": None}
+                return PublicationResult(response=token_error)
 
-            token_data = json.loads(token)
+            token_data = loads_token(token)
             if user_sent_tokens:
                 token_data.update(
-                    {
-                        "access_token": data["access_token"],
-                        "refresh_token": data["refresh_token"],
-                    }
+                    {"access_token": access_token, "refresh_token": refresh_token}
                 )
-            params = {"token": token_data}
-            params.update(
-                {
-                    k: v
-                    for k, v in data.items()
-                    if k not in ["access_token", "refresh_token"]
-                }
-            )
+            params = {"token": token_data, **message_params}
 
             pipe = AdapterIPCHandler.invoke(
                 adapter_path=adapter["path"],
                 venv_path=adapter["venv_path"],
+                persistent_worker=adapter["persistent_worker"],
                 method="send_message",
                 params=params,
             )
 
             if error := pipe.get("error"):
-                return {"response": None, "error": error, "message": None}
+                return PublicationResult(error=error)
 
             result = pipe.get("result", {})
             refreshed_token = result.get("refreshed_token", {})
             new_refresh_token = refreshed_token.get("refresh_token")
-            old_refresh_token = data.get("refresh_token")
-            is_refresh_token_updated = new_refresh_token != old_refresh_token
+            is_refresh_token_updated = new_refresh_token != refresh_token
 
             refresh_alert = None
             if is_refresh_token_updated and user_sent_tokens:
-                refresh_token_msg = f"{data['sender_id']}:{new_refresh_token}"
+                refresh_token_msg = binascii.b2a_base64(
+                    f"{sender_id}:{new_refresh_token}".encode(), newline=False
+                ).decode("ascii")
                 refresh_alert = (
                     "\n\nPlease paste this message in your RelaySMS app\n"
-                    f"{base64.b64encode(refresh_token_msg.encode()).decode('utf-8')}"
+                    f"{refresh_token_msg}"
                 )
 
             if not user_sent_tokens:
                 handle_token_update(
                     token=refreshed_token,
                     device_id=kwargs.get("device_id"),
-                    phone_number=request.metadata["From"],
-                    account_identifier=data["sender_id"],
-                    platform=platform_name.lower(),
+                    phone_number=sender_phone_number,
+                    account_identifier=sender_id,
+                    platform=platform,
                 )
 
-            return {
-                "response": None,
-                "error": result.get("message") if not result.get("success") else None,
-                "message": "Successfully sent message",
-                "refresh_alert": refresh_alert,
-            }
+            return PublicationResult(
+                error=result.get("message") if not result.get("success") else None,
+                message="Successfully sent message",
+                refresh_alert=refresh_alert,
+            )
 
         def handle_pnba_publication(
             service_type, platform_name, content_parts, **kwargs
         ):
-            service_handlers = {
-                "message": lambda parts: {
-                    "sender_id": parts[0],
-                    "recipient": parts[1],
-                    "message": parts[2],
-                }
-            }
-
-            if service_type not in service_handlers:
+            if service_type != "message":
                 raise NotImplementedError(
                     f"The service type '{service_type}' for '{platform_name}' "
                     "is not supported. Please contact the developers for more information."
                 )
 
-            data = service_handlers[service_type](content_parts)
+            sender_id, recipient, message = content_parts[:3]
 
-            adapter = AdapterManager.get_adapter_path(
-                name=platform_name.lower(), protocol="pnba"
-            )
+            platform = platform_name.lower()
+            adapter = AdapterManager.get_adapter_path(name=platform, protocol="pnba")
             if not adapter:
                 raise NotImplementedError(
-                    f"The platform '{platform_name.lower()}' with "
+                    f"The platform '{platform}' with "
                     "protocol 'pnba' is currently not supported. "
                     "Please contact the developers for more information on when "
                     "this platform will be implemented."
@@ -772,60 +1252,54 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
 
             token, token_error = get_access_token(
                 device_id=kwargs.get("device_id"),
-                phone_number=request.metadata["From"],
+                phone_number=sender_phone_number,
                 platform_name=platform_info["name"],
-                account_identifier=data["sender_id"],
+                account_identifier=sender_id,
             )
             if token_error:
-                return {"response": token_error, "error": None, "message": None}
+                return PublicationResult(response=token_error)
 
             params = {
-                "phone_number": json.loads(token),
-                "recipient": data["recipient"],
-                "message": data["message"],
+                "phone_number": loads_token(token),
+                "recipient": recipient,
+                "message": message,
                 "base_path": adapter["assets_path"],
             }
 
             pipe = AdapterIPCHandler.invoke(
                 adapter_path=adapter["path"],
                 venv_path=adapter["venv_path"],
+                persistent_worker=adapter["persistent_worker"],
                 method="send_message",
                 params=params,
             )
 
             if pipe.get("error"):
-                return {"response": None, "error": pipe.get("error"), "message": None}
+                return PublicationResult(error=pipe.get("error"))
 
-            return {
-                "response": None,
-                "error": None,
-                "message": "Successfully sent message",
-            }
+            return PublicationResult(message="Successfully sent message")
 
         def handle_test_publication(service_type, platform_name, content_parts):
-            service_handlers = {"test": lambda parts: {"test_id": parts[0]}}
-
-            if service_type not in service_handlers:
+            if service_type != "test":
                 raise NotImplementedError(
                     f"The service type '{service_type}' for '{platform_name}' "
                     "is not supported. Please contact the developers for more information."
                 )
 
-            data = service_handlers[service_type](content_parts)
+            test_id = content_parts[0]
 
-            adapter = AdapterManager.get_adapter_path(
-                name=platform_name.lower(), protocol="event"
-            )
+            platform = platform_name.lower()
+            adapter = AdapterManager.get_adapter_path(name=platform, protocol="event")
             if not adapter:
                 raise NotImplementedError(
-                    f"The platform '{platform_name.lower()}' with "
+                    f"The platform '{platform}' with "
                     "protocol 'event' is currently not supported. "
                     "Please contact the developers for more information on when "
                     "this platform will be implemented."
                 )
 
             params = {
-                "resource_id": data["test_id"],
+                "resource_id": test_id,
                 "sms_sent_timestamp": request.metadata.get("Date_sent"),
                 "sms_received_timestamp": request.metadata.get("Date"),
             }
@@ -833,272 +1307,251 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
             pipe = AdapterIPCHandler.invoke(
                 adapter_path=adapter["path"],
                 venv_path=adapter["venv_path"],
+                persistent_worker=adapter["persistent_worker"],
                 method="update",
                 params=params,
             )
 
             if pipe.get("error"):
-                return {"response": None, "error": pipe.get("error"), "message": None}
+                return PublicationResult(error=pipe.get("error"))
 
             result = pipe.get("result")
 
             if not result.get("success"):
-                return {
-                    "response": self.handle_create_grpc_error_response(
+                return PublicationResult(
+                    response=self.handle_create_grpc_error_response(
                         context,
                         response,
                         result.get("message"),
                         grpc.StatusCode.INVALID_ARGUMENT,
-                    ),
-                    "error": None,
-                    "message": None,
-                }
+                    )
+                )
 
-            return {
-                "response": response(
-                    message=f"Successfully published {platform_name.lower()} message",
+            return PublicationResult(
+                response=response(
+                    message=f"Successfully published {platform} message",
                     publisher_response=result.get("message"),
                     success=True,
-                ),
-                "error": None,
-                "message": None,
-            }
+                )
+            )
 
         def handle_publication_notifications(
-            platform_name, status="failed", country_code=None, **kwargs
+            platform_name, publication_ctx, status="failed", **kwargs
         ):
-            try:
-                loc.set_locale(kwargs.get("language") or "en")
-            except ValueError as e:
-                logger.error(e)
-
-            timestamp = datetime.datetime.now(tz=datetime.timezone.utc).strftime(
-                "%Y-%m-%d %H:%M:%S (%Z)"
+            notification = PublicationNotification(
+                platform_name=platform_name,
+                publication_ctx=publication_ctx,
+                status=status,
+                additional_data=kwargs.get("additional_data"),
+                phone_number=sender_phone_number,
+                timestamp=time.time(),
             )
-            message = (
-                t("sms_delivery_message")
-                .format(
-                    additional_data=kwargs.get("additional_data") or "",
-                    platform_name=platform_name,
-                    delivery_status=(
-                        t("delivery_status_failed")
-                        if status == "failed"
-                        else t("delivery_status_success")
-                    ),
-                    timestamp=timestamp,
-                )
-                .replace("\\n", "\n")
+            try:
+                _NOTIFY_Q.put_nowait(notification)
+            except queue.Full:
+                logger.warning("Notification queue is full. Dispatching inline.")
+                handle_publication_notifications_batch([notification])
+
+        def handle_failed_publication(additional_data=None):
+            # Failures before the payload is decrypted have no platform or
+            # sender context to report.
+            if publication_ctx is None:
+                return
+            handle_publication_notifications(
+                platform_info["name"],
+                publication_ctx,
+                status="failed",
+                additional_data=additional_data,
             )
-            notifications = [
-                {
-                    "notification_type": "event",
-                    "target": "publication",
-                    "details": {
-                        "platform_name": platform_name,
-                        "source": "platforms",
-                        "status": status,
-                        "country_code": country_code,
-                    },
-                },
-            ]
-            if MOCK_DELIVERY_SMS:
-                notifications.append(
-                    {
-                        "notification_type": "event",
-                        "target": "sentry",
-                        "message": message,
-                        "details": {"level": "info", "capture_type": "message"},
-                    }
-                )
-            else:
-                notifications.append(
-                    {
-                        "notification_type": "sms",
-                        "target": request.metadata["From"],
-                        "message": message,
-                    }
-                )
-            dispatch_notifications(notifications)
+
+        platform_info = publication_ctx = None
 
         try:
-            invalid_fields_response = validate_fields()
+            invalid_fields_response = self.handle_request_field_validation(
+                context,
+                request,
+                response,
+                PUBLISH_REQUIRED_FIELDS,
+                required_metadata=PUBLISH_REQUIRED_METADATA,
+            )
             if invalid_fields_response:
                 return invalid_fields_response
 
-            decoded_payload, decoding_error = decode_payload()
-            if decoding_error:
-                return decoding_error
-
-            platform_info, platform_info_error = get_platform_info(
-                decoded_payload.get("platform_shortcode")
+            sender_phone_number = request.metadata["From"]
+            idempotency_key = (
+                hashlib.sha256(request.content.encode("utf-8")).digest(),
+                sender_phone_number,
             )
-            if platform_info_error:
-                return platform_info_error
+            publication, cached_response = claim_publication(idempotency_key)
+            if cached_response is not None:
+                logger.info(
+                    "Duplicate publication detected. Returning cached response."
+                )
+                return cached_response
+            publish_response = None
+            try:
 
-            device_id_hex = (
-                decoded_payload.get("device_id").hex()
-                if decoded_payload.get("device_id")
-                else None
-            )
-            decrypted_result, decrypt_error = decrypt_message(
-                device_id=device_id_hex,
-                phone_number=request.metadata["From"],
-                encrypted_content=decoded_payload.get("ciphertext"),
-            )
+                decoded_payload, decoding_error = decode_payload()
+                if decoding_error:
+                    return decoding_error
 
-            if decrypt_error:
-                return decrypt_error
+                platform_info, platform_info_error = get_platform_info(
+                    decoded_payload.get("platform_shortcode")
+                )
+                if platform_info_error:
+                    return platform_info_error
 
-            extraction_error = None
-            content_parts = None
-            if "version" in decoded_payload:
-                if decoded_payload.get("version") == "v1":
-                    content_parts, extraction_error = extract_content_v1(
-                        platform_info["service_type"],
-                        decrypted_result.get("payload_plaintext"),
-                    )
-                elif decoded_payload.get("version") == "v2":
-                    content_parts, extraction_error = extract_content_v2(
-                        platform_info["service_type"],
-                        decrypted_result.get("payload_plaintext"),
-                    )
-            else:
-                content_parts, extraction_error = extract_content_v0(
-                    platform_info["service_type"],
-                    decrypted_result.get("payload_plaintext").decode("utf-8"),
+                device_id = decoded_payload.get("device_id")
+                device_id_hex = device_id.hex() if device_id else None
+                decrypted_result, decrypt_error = decrypt_message(
+                    device_id=device_id_hex,
+                    phone_number=sender_phone_number,
+                    encrypted_content=decoded_payload.get("ciphertext"),
                 )
 
-            if extraction_error:
-                return self.handle_create_grpc_error_response(
-                    context,
-                    response,
-                    extraction_error,
-                    grpc.StatusCode.INVALID_ARGUMENT,
-                    send_to_sentry=True,
+                if decrypt_error:
+                    return decrypt_error
+
+                publication_ctx = PublicationContext(
+                    country_code=decrypted_result.country_code,
+                    language=decoded_payload.get("language"),
                 )
 
-            content_parts = list(content_parts)
-            content_parts[0] = content_parts[0].replace("\n", "")
-            content_parts = tuple(content_parts)
+                payload_plaintext = decrypted_result.payload_plaintext
+                version = decoded_payload.get("version")
+                if version is None:
+                    content_parts, extraction_error = extract_content_v0(
+                        platform_info["service_type"], payload_plaintext.decode("utf-8")
+                    )
+                elif version in CONTENT_EXTRACTORS:
+                    content_parts, extraction_error = CONTENT_EXTRACTORS[version](
+                        platform_info["service_type"], payload_plaintext
+                    )
+                else:
+                    content_parts = None
+                    extraction_error = f"Unsupported payload version '{version}'."
 
-            publication_response = None
+                if extraction_error:
+                    return self.handle_create_grpc_error_response(
+                        context,
+                        response,
+                        extraction_error,
+                        grpc.StatusCode.INVALID_ARGUMENT,
+                        send_to_sentry=True,
+                    )
 
-            if platform_info["protocol_type"] == "oauth2":
-                publication_response = handle_oauth2_publication(
-                    service_type=platform_info["service_type"],
-                    platform_name=platform_info["name"],
-                    content_parts=content_parts,
-                    device_id=device_id_hex,
-                )
-            elif platform_info["protocol_type"] == "pnba":
-                publication_response = handle_pnba_publication(
-                    service_type=platform_info["service_type"],
-                    platform_name=platform_info["name"],
-                    content_parts=content_parts,
-                    device_id=device_id_hex,
-                )
-            elif platform_info["protocol_type"] == "event":
-                publication_response = handle_test_publication(
-                    service_type=platform_info["service_type"],
-                    platform_name=platform_info["name"],
-                    content_parts=content_parts,
-                )
+                if "\n" in content_parts[0]:
+                    content_parts = (
+                        content_parts[0].translate(_STRIP_NEWLINES),
+                        *content_parts[1:],
+                    )
+
+                publication_response = None
 
-            if publication_response["response"]:
-                return publication_response["response"]
+                if platform_info["protocol_type"] == "oauth2":
+                    publication_response = handle_oauth2_publication(
+                        service_type=platform_info["service_type"],
+                        platform_name=platform_info["name"],
+                        content_parts=content_parts,
+                        device_id=device_id_hex,
+                    )
+                elif platform_info["protocol_type"] == "pnba":
+                    publication_response = handle_pnba_publication(
+                        service_type=platform_info["service_type"],
+                        platform_name=platform_info["name"],
+                        content_parts=content_parts,
+                        device_id=device_id_hex,
+                    )
+                elif platform_info["protocol_type"] == "event":
+                    publication_response = handle_test_publication(
+                        service_type=platform_info["service_type"],
+                        platform_name=platform_info["name"],
+                        content_parts=content_parts,
+                    )
+
+                if publication_response is None:
+                    return self.handle_create_grpc_error_response(
+                        context,
+                        response,
+                        f"The protocol '{platform_info['protocol_type']}' for platform "
+                        f"'{platform_info['name']}' is currently not supported.",
+                        grpc.StatusCode.UNIMPLEMENTED,
+                    )
+
+                if publication_response.response:
+                    return publication_response.response
+
+                if publication_response.error:
+                    handle_failed_publication(publication_response.refresh_alert)
+                    return self.handle_create_grpc_error_response(
+                        context,
+                        response,
+                        publication_response.error,
+                        grpc.StatusCode.INVALID_ARGUMENT,
+                        send_to_sentry=True,
+                    )
 
-            if publication_response["error"]:
                 handle_publication_notifications(
                     platform_info["name"],
-                    status="failed",
-                    country_code=decrypted_result.get("country_code"),
-                    language=decoded_payload.get("language"),
-                    additional_data=publication_response.get("refresh_alert"),
+                    publication_ctx,
+                    status="published",
+                    additional_data=publication_response.refresh_alert,
                 )
-                return self.handle_create_grpc_error_response(
-                    context,
-                    response,
-                    publication_response["error"],
-                    grpc.StatusCode.INVALID_ARGUMENT,
-                    send_to_sentry=True,
+                publish_response = response(
+                    message=f"Successfully published {platform_info['name']} message",
+                    publisher_response=publication_response.message,
+                    success=True,
                 )
+                return publish_response
+            finally:
+                release_publication(idempotency_key, publication, publish_response)
 
-            handle_publication_notifications(
-                platform_info["name"],
-                status="published",
-                country_code=decrypted_result.get("country_code"),
-                language=decoded_payload.get("language"),
-                additional_data=publication_response.get("refresh_alert"),
-            )
-            return response(
-                message=f"Successfully published {platform_info['name']} message",
-                publisher_response=publication_response["message"],
-                success=True,
+        except Exception as exc:
+            if not isinstance(exc, NotImplementedError):
+                handle_failed_publication()
+            return self.handle_rpc_exception(
+                context, response, exc, send_to_sentry=True
             )
 
-        except NotImplementedError as e:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                str(e),
-                grpc.StatusCode.UNIMPLEMENTED,
-            )
+    def PublishContentStream(self, request_iterator, context):
+        """Handles publishing a stream of content, one response per request"""
 
-        except Exception as exc:
-            handle_publication_notifications(
-                platform_info["name"],
-                status="failed",
-                country_code=decrypted_result.get("country_code"),
-                language=decoded_payload.get("language"),
-            )
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                exc,
-                grpc.StatusCode.INTERNAL,
-                user_msg="Oops! Something went wrong. Please try again later.",
-                error_type="UNKNOWN",
-                send_to_sentry=True,
-            )
+        for request in request_iterator:
+            item_context = RecordedStatusContext(context)
+            publish_response = self.PublishContent(request, item_context)
+            yield stream_item_response(publish_response, item_context)
 
     def GetPNBACode(self, request, context):
         """Handles Requesting Phone number-based Authentication."""
 
         response = publisher_pb2.GetPNBACodeResponse
 
-        def validate_fields():
-            return self.handle_request_field_validation(
-                context,
-                request,
-                response,
-                ["phone_number", "platform"],
-            )
-
         try:
-            invalid_fields_response = validate_fields()
+            invalid_fields_response = self.handle_request_field_validation(
+                context, request, response, PNBA_CODE_REQUIRED_FIELDS
+            )
             if invalid_fields_response:
                 return invalid_fields_response
 
+            platform_name = request.platform.lower()
             adapter = AdapterManager.get_adapter_path(
-                name=request.platform.lower(), protocol="pnba"
+                name=platform_name, protocol="pnba"
             )
             if not adapter:
-                raise NotImplementedError(
-                    f"The platform '{request.platform.lower()}' with "
-                    "protocol 'pnba' is currently not supported. "
-                    "Please contact the developers for more information on when "
-                    "this platform will be implemented."
+                return self.handle_unsupported_platform(
+                    context, response, platform_name, "pnba"
                 )
 
             params = {
                 "phone_number": request.phone_number,
                 "base_path": adapter["assets_path"],
-                "request_identifier": getattr(request, "request_identifier") or None,
+                "request_identifier": request.request_identifier or None,
             }
 
             pipe = AdapterIPCHandler.invoke(
                 adapter_path=adapter["path"],
                 venv_path=adapter["venv_path"],
+                persistent_worker=adapter["persistent_worker"],
                 method="send_authorization_code",
                 params=params,
             )
@@ -1124,37 +1577,14 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
 
             return response(success=True, message=result.get("message"))
 
-        except NotImplementedError as e:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                str(e),
-                grpc.StatusCode.UNIMPLEMENTED,
-            )
-
         except Exception as exc:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                exc,
-                grpc.StatusCode.INTERNAL,
-                user_msg="Oops! Something went wrong. Please try again later.",
-                error_type="UNKNOWN",
-            )
+            return self.handle_rpc_exception(context, response, exc)
 
     def ExchangePNBACodeAndStore(self, request, context):
         """Handles Exchanging Phone number-based Authentication code for access."""
 
         response = publisher_pb2.ExchangePNBACodeAndStoreResponse
 
-        def validate_fields():
-            return self.handle_request_field_validation(
-                context,
-                request,
-                response,
-                ["long_lived_token", "phone_number", "platform", "authorization_code"],
-            )
-
         def list_tokens():
             list_response, list_error = list_entity_stored_tokens(
                 long_lived_token=request.long_lived_token
@@ -1174,7 +1604,7 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                 long_lived_token=request.long_lived_token,
                 platform=request.platform,
                 account_identifier=userinfo.get("account_identifier"),
-                token=json.dumps(userinfo.get("account_identifier")),
+                token=dumps_token(userinfo.get("account_identifier")),
             )
 
             if store_error:
@@ -1191,42 +1621,45 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                     message=store_response.message, success=store_response.success
                 )
 
+            invalidate_cached_access_tokens(
+                request.platform, userinfo.get("account_identifier")
+            )
             return response(
                 success=True, message="Successfully fetched and stored token"
             )
 
         try:
-            invalid_fields_response = validate_fields()
+            invalid_fields_response = self.handle_request_field_validation(
+                context, request, response, PNBA_EXCHANGE_REQUIRED_FIELDS
+            )
             if invalid_fields_response:
                 return invalid_fields_response
 
+            platform_name = request.platform.lower()
             adapter = AdapterManager.get_adapter_path(
-                name=request.platform.lower(), protocol="pnba"
+                name=platform_name, protocol="pnba"
             )
             if not adapter:
-                raise NotImplementedError(
-                    f"The platform '{request.platform.lower()}' with "
-                    "protocol 'pnba' is currently not supported. "
-                    "Please contact the developers for more information on when "
-                    "this platform will be implemented."
+                return self.handle_unsupported_platform(
+                    context, response, platform_name, "pnba"
                 )
 
+            # The listing authenticates the long-lived token, so it has to
+            # finish before the adapter opens a platform session.
             _, token_list_error = list_tokens()
             if token_list_error:
                 return token_list_error
 
-            params = {
-                "code": request.authorization_code,
-                "phone_number": request.phone_number,
-                "base_path": adapter["assets_path"],
-                "password": getattr(request, "password") or None,
-                "request_identifier": getattr(request, "request_identifier") or None,
-            }
+            params = read_optional_fields(request, PNBA_EXCHANGE_OPTIONAL_FIELDS)
+            params["code"] = request.authorization_code
+            params["phone_number"] = request.phone_number
+            params["base_path"] = adapter["assets_path"]
 
             if params.get("password"):
                 pipe = AdapterIPCHandler.invoke(
                     adapter_path=adapter["path"],
                     venv_path=adapter["venv_path"],
+                    persistent_worker=adapter["persistent_worker"],
                     method="validate_password_and_fetch_user_info",
                     params=params,
                 )
@@ -1234,6 +1667,7 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                 pipe = AdapterIPCHandler.invoke(
                     adapter_path=adapter["path"],
                     venv_path=adapter["venv_path"],
+                    persistent_worker=adapter["persistent_worker"],
                     method="validate_code_and_fetch_user_info",
                     params=params,
                 )
@@ -1257,37 +1691,14 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
 
             return store_token(userinfo=result.get("userinfo"))
 
-        except NotImplementedError as e:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                str(e),
-                grpc.StatusCode.UNIMPLEMENTED,
-            )
-
         except Exception as exc:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                exc,
-                grpc.StatusCode.INTERNAL,
-                user_msg="Oops! Something went wrong. Please try again later.",
-                error_type="UNKNOWN",
-            )
+            return self.handle_rpc_exception(context, response, exc)
 
     def RevokeAndDeletePNBAToken(self, request, context):
         """Handles revoking and deleting PNBA access tokens"""
 
         response = publisher_pb2.RevokeAndDeletePNBATokenResponse
 
-        def validate_fields():
-            return self.handle_request_field_validation(
-                context,
-                request,
-                response,
-                ["long_lived_token", "platform", "account_identifier"],
-            )
-
         def get_access_token():
             get_access_token_response, get_access_token_error = get_entity_access_token(
                 platform=request.platform,
@@ -1308,12 +1719,23 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                 )
             return get_access_token_response.token, None
 
-        def delete_token():
-            delete_token_response, delete_token_error = delete_entity_token(
+        def start_delete_token():
+            delete_future, delete_token_error = delete_entity_token_future(
                 request.long_lived_token, request.platform, request.account_identifier
             )
-
             if delete_token_error:
+                return None, self.handle_create_grpc_error_response(
+                    context,
+                    response,
+                    delete_token_error.details(),
+                    delete_token_error.code(),
+                )
+            return delete_future, None
+
+        def wait_for_delete_token(delete_future):
+            try:
+                delete_token_response = delete_future.result()
+            except grpc.RpcError as delete_token_error:
                 return self.handle_create_grpc_error_response(
                     context,
                     response,
@@ -1327,22 +1749,25 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                     success=delete_token_response.success,
                 )
 
+            invalidate_cached_access_tokens(
+                request.platform, request.account_identifier
+            )
             return response(success=True, message="Successfully deleted token")
 
         try:
-            invalid_fields_response = validate_fields()
+            invalid_fields_response = self.handle_request_field_validation(
+                context, request, response, PNBA_REVOKE_REQUIRED_FIELDS
+            )
             if invalid_fields_response:
                 return invalid_fields_response
 
+            platform_name = request.platform.lower()
             adapter = AdapterManager.get_adapter_path(
-                name=request.platform.lower(), protocol="pnba"
+                name=platform_name, protocol="pnba"
             )
             if not adapter:
-                raise NotImplementedError(
-                    f"The platform '{request.platform.lower()}' with "
-                    "protocol 'pnba' is currently not supported. "
-                    "Please contact the developers for more information on when "
-                    "this platform will be implemented."
+                return self.handle_unsupported_platform(
+                    context, response, platform_name, "pnba"
                 )
 
             access_token, access_token_error = get_access_token()
@@ -1350,13 +1775,20 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
                 return access_token_error
 
             params = {
-                "phone_number": json.loads(access_token),
+                "phone_number": loads_token(access_token),
                 "base_path": adapter["assets_path"],
             }
 
+            # Invalidating the session and deleting the stored token don't
+            # depend on each other, so the vault deletion runs alongside.
+            delete_future, delete_token_error = start_delete_token()
+            if delete_token_error:
+                return delete_token_error
+
             pipe = AdapterIPCHandler.invoke(
                 adapter_path=adapter["path"],
                 venv_path=adapter["venv_path"],
+                persistent_worker=adapter["persistent_worker"],
                 method="invalidate_session",
                 params=params,
             )
@@ -1364,22 +1796,125 @@ class PublisherService(publisher_pb2_grpc.PublisherServicer):
             if pipe.get("error"):
                 logger.error(pipe.get("error"))
 
-            return delete_token()
-
-        except NotImplementedError as e:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                str(e),
-                grpc.StatusCode.UNIMPLEMENTED,
-            )
+            return wait_for_delete_token(delete_future)
 
         except Exception as exc:
-            return self.handle_create_grpc_error_response(
-                context,
-                response,
-                exc,
-                grpc.StatusCode.INTERNAL,
-                user_msg="Oops! Something went wrong. Please try again later.",
-                error_type="UNKNOWN",
-            )
+            return self.handle_rpc_exception(context, response, exc)
+
+
+class AsyncPublisherService(publisher_pb2_grpc.PublisherServicer):
+    """Asyncio gRPC Publisher Service.
+
+    Serves RPCs on the event loop and runs the blocking PublisherService
+    handlers on a thread pool, so in-flight RPCs are no longer capped by the
+    server's worker threads.
+    """
+
+    def __init__(self, service=None, executor=None):
+        self.service = service or PublisherService()
+        self.executor = executor
+
+    async def run_handler(self, handler, request, context):
+        """Run a blocking handler off the event loop.
+
+        Args:
+            handler (callable): The PublisherService handler.
+            request (protobuf message): The incoming request.
+            context (RecordedStatusContext): The context the handler reports to.
+
+        Returns:
+            protobuf message: The handler's response.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, handler, request, context)
+
+    async def handle_unary(self, handler, request, context):
+        """Run a unary handler and apply its status to the RPC context."""
+        call_context = RecordedStatusContext(context)
+        response = await self.run_handler(handler, request, call_context)
+        call_context.apply()
+        return response
+
+    async def GetOAuth2AuthorizationUrl(self, request, context):
+        """Serves GetOAuth2AuthorizationUrl using PublisherService."""
+        return await self.handle_unary(
+            self.service.GetOAuth2AuthorizationUrl, request, context
+        )
+
+    async def ExchangeOAuth2CodeAndStore(self, request, context):
+        """Serves ExchangeOAuth2CodeAndStore using PublisherService."""
+        return await self.handle_unary(
+            self.service.ExchangeOAuth2CodeAndStore, request, context
+        )
+
+    async def RevokeAndDeleteOAuth2Token(self, request, context):
+        """Serves RevokeAndDeleteOAuth2Token using PublisherService."""
+        return await self.handle_unary(
+            self.service.RevokeAndDeleteOAuth2Token, request, context
+        )
+
+    async def PublishContent(self, request, context):
+        """Serves PublishContent using PublisherService."""
+        return await self.handle_unary(self.service.PublishContent, request, context)
+
+    async def PublishContentStream(self, request_iterator, context):
+        """Serves PublishContentStream using PublisherService.
+
+        Up to STREAM_MAX_IN_FLIGHT requests are handled concurrently while
+        responses are still yielded in request order.
+        """
+        in_flight = asyncio.Semaphore(STREAM_MAX_IN_FLIGHT)
+        pending = asyncio.Queue()
+
+        async def submit_requests():
+            try:
+                async for request in request_iterator:
+                    await in_flight.acquire()
+                    item_context = RecordedStatusContext(context)
+                    publish_task = asyncio.ensure_future(
+                        self.run_handler(
+                            self.service.PublishContent, request, item_context
+                        )
+                    )
+                    pending.put_nowait((publish_task, item_context))
+            finally:
+                pending.put_nowait(None)
+
+        reader = asyncio.create_task(submit_requests())
+        try:
+            while (item := await pending.get()) is not None:
+                publish_task, item_context = item
+                try:
+                    publish_response = await publish_task
+                finally:
+                    in_flight.release()
+                yield stream_item_response(publish_response, item_context)
+            await reader
+        finally:
+            reader.cancel()
+            # When the stream ends early, cancel the requests that have not
+            # started and wait for the rest so none outlives the RPC.
+            abandoned = [reader]
+            while not pending.empty():
+                if item := pending.get_nowait():
+                    publish_task, _ = item
+                    publish_task.cancel()
+                    in_flight.release()
+                    abandoned.append(publish_task)
+            await asyncio.gather(*abandoned, return_exceptions=True)
+
+    async def GetPNBACode(self, request, context):
+        """Serves GetPNBACode using PublisherService."""
+        return await self.handle_unary(self.service.GetPNBACode, request, context)
+
+    async def ExchangePNBACodeAndStore(self, request, context):
+        """Serves ExchangePNBACodeAndStore using PublisherService."""
+        return await self.handle_unary(
+            self.service.ExchangePNBACodeAndStore, request, context
+        )
+
+    async def RevokeAndDeletePNBAToken(self, request, context):
+        """Serves RevokeAndDeletePNBAToken using PublisherService."""
+        return await self.handle_unary(
+            self.service.RevokeAndDeletePNBAToken, request, context
+        )
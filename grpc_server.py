@@ -1,25 +1,102 @@
 """Publisher gRPC server"""
 
 import os
+import signal
+import time
+import asyncio
+import multiprocessing
 from concurrent import futures
 
 import grpc
-from grpc_interceptor import ServerInterceptor
+from grpc_interceptor import AsyncServerInterceptor
 import publisher_pb2_grpc
 
 from utils import get_configs
 from logutils import get_logger
 from sentry_config import initialize_sentry, SENTRY_ENABLED
-from grpc_publisher_service import PublisherService
+from grpc_publisher_service import (
+    AsyncPublisherService,
+    flush_publication_notifications,
+    preload_delivery_templates,
+)
+from notification_dispatcher import shutdown_dispatcher
 from platforms.adapter_manager import AdapterManager
+from platforms.adapter_ipc_handler import AdapterIPCHandler
 
 logger = get_logger("publisher.grpc.server")
 
+SERVER_OPTIONS = [
+    ("grpc.max_concurrent_streams", 1000),
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+GRPC_UVLOOP = (
+    get_configs("GRPC_UVLOOP", default_value="false") or ""
+).lower() == "true"
+
+# Seconds between checks of the TLS certificate files for changes.
+TLS_RELOAD_INTERVAL = float(get_configs("TLS_RELOAD_INTERVAL", default_value="60"))
+
 if SENTRY_ENABLED:
     initialize_sentry()
 
 
-class LoggingInterceptor(ServerInterceptor):
+class CertificateReloader:
+    """
+    Serves the server's TLS certificate, reloading it when it changes on disk.
+
+    Used as the certificate configuration fetcher of dynamic SSL server
+    credentials, so a renewed certificate is picked up by new connections
+    without restarting the server. The fetcher runs on every handshake, so
+    the files are only checked once every ``TLS_RELOAD_INTERVAL`` seconds.
+    """
+
+    def __init__(self, certificate_path, key_path):
+        self.paths = (certificate_path, key_path)
+        self.mtimes = None
+        self.configuration = self.load()
+        self.next_check = time.monotonic() + TLS_RELOAD_INTERVAL
+
+    def load(self):
+        """
+        Read the certificate and private key.
+
+        Returns:
+            grpc.ServerCertificateConfiguration: The loaded configuration.
+        """
+        mtimes = tuple(os.stat(path).st_mtime_ns for path in self.paths)
+        certificate_path, key_path = self.paths
+        with open(certificate_path, "rb") as f:
+            certificate_data = f.read()
+        with open(key_path, "rb") as f:
+            key_data = f.read()
+        self.mtimes = mtimes
+        return grpc.ssl_server_certificate_configuration(
+            ((key_data, certificate_data),)
+        )
+
+    def __call__(self):
+        """
+        Return a new configuration if the files changed, otherwise None.
+        """
+        now = time.monotonic()
+        if now < self.next_check:
+            return None
+        self.next_check = now + TLS_RELOAD_INTERVAL
+        try:
+            mtimes = tuple(os.stat(path).st_mtime_ns for path in self.paths)
+            if mtimes == self.mtimes:
+                return None
+            self.configuration = self.load()
+        except Exception:  # pylint: disable=broad-except
+            logger.exception("Unable to reload TLS credentials, keeping current ones")
+            return None
+        logger.info("Reloaded TLS credentials from %s", self.paths[0])
+        return self.configuration
+
+
+class LoggingInterceptor(AsyncServerInterceptor):
     """
     gRPC server interceptor for logging requests.
     """
@@ -30,27 +107,52 @@ class LoggingInterceptor(ServerInterceptor):
         """
         self.logger = logger
         self.server_protocol = "HTTP/2.0"
+        self.ok_format = f"%s {self.server_protocol} - OK -"
+        self.error_format = f"%s {self.server_protocol} - %s -"
 
-    def intercept(self, method, request_or_iterator, context, method_name):
+    def log_outcome(self, method_name, context, failed=False):
         """
-        Intercept method calls for each incoming RPC.
+        Log the outcome of an RPC from the status set on its context.
         """
-        response = method(request_or_iterator, context)
-        if context.details():
+        code = context.code()
+        if failed or context.details() or code not in (None, grpc.StatusCode.OK):
             self.logger.error(
-                "%s %s - %s -",
-                method_name,
-                self.server_protocol,
-                str(context.code()).split(".")[1],
+                self.error_format, method_name, code.name if code else "UNKNOWN"
             )
         else:
-            self.logger.info("%s %s - %s -", method_name, self.server_protocol, "OK")
+            self.logger.info(self.ok_format, method_name)
+
+    async def log_stream(self, responses, method_name, context):
+        """
+        Yield the responses of a streaming RPC, logging it once the stream ends.
+        """
+        failed = True
+        try:
+            async for response in responses:
+                yield response
+            failed = False
+        finally:
+            self.log_outcome(method_name, context, failed)
+
+    async def intercept(self, method, request_or_iterator, context, method_name):
+        """
+        Intercept method calls for each incoming RPC.
+        """
+        response = method(request_or_iterator, context)
+        if hasattr(response, "__aiter__"):
+            return self.log_stream(response, method_name, context)
+        response = await response
+        self.log_outcome(method_name, context)
         return response
 
 
-def serve():
+async def serve(reuse_port=False):
     """
-    Starts the gRPC server and listens for requests using a thread pool.
+    Starts the asyncio gRPC server, running blocking handlers on a thread pool.
+
+    Args:
+        reuse_port (bool): Bind with SO_REUSEPORT so several server processes
+            can share the same port.
     """
     mode = get_configs("MODE", False, "development")
     server_certificate = get_configs("SSL_CERTIFICATE")
@@ -60,7 +162,11 @@ def serve():
     port = get_configs("GRPC_PORT")
 
     num_cpu_cores = os.cpu_count()
-    max_workers = 10
+    # Handlers mostly wait on the vault and adapters, so scale well past the
+    # core count.
+    max_workers = int(
+        get_configs("GRPC_MAX_WORKERS", default_value=max(32, (num_cpu_cores or 1) * 8))
+    )
 
     logger.info("Starting server in %s mode...", mode)
     logger.info("Hostname: %s", hostname)
@@ -69,21 +175,25 @@ def serve():
     logger.info("Logical CPU cores available: %s", num_cpu_cores)
     logger.info("gRPC server max workers: %s", max_workers)
 
-    grpc_server = grpc.server(
-        futures.ThreadPoolExecutor(max_workers=max_workers),
+    executor = futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="publisher"
+    )
+    options = SERVER_OPTIONS
+    if reuse_port:
+        options = SERVER_OPTIONS + [("grpc.so_reuseport", 1)]
+    grpc_server = grpc.aio.server(
         interceptors=[LoggingInterceptor()],
+        options=options,
+    )
+    publisher_pb2_grpc.add_PublisherServicer_to_server(
+        AsyncPublisherService(executor=executor), grpc_server
     )
-    publisher_pb2_grpc.add_PublisherServicer_to_server(PublisherService(), grpc_server)
 
     if mode == "production":
         try:
-            with open(server_certificate, "rb") as f:
-                server_certificate_data = f.read()
-            with open(private_key, "rb") as f:
-                private_key_data = f.read()
-
-            server_credentials = grpc.ssl_server_credentials(
-                ((private_key_data, server_certificate_data),)
+            certificate_reloader = CertificateReloader(server_certificate, private_key)
+            server_credentials = grpc.dynamic_ssl_server_credentials(
+                certificate_reloader.configuration, certificate_reloader
             )
             grpc_server.add_secure_port(f"{hostname}:{secure_port}", server_credentials)
             logger.info(
@@ -115,16 +225,84 @@ def serve():
             "The server is running in insecure mode at %s:%s", hostname, port
         )
 
-    grpc_server.start()
+    await grpc_server.start()
     AdapterManager._populate_registry()
+    for manifest in AdapterManager._registry.values():
+        if manifest["persistent_worker"]:
+            AdapterIPCHandler.ensure_pool(manifest["path"], manifest["venv_path"])
+    preload_delivery_templates()
 
-    try:
-        grpc_server.wait_for_termination()
-    except KeyboardInterrupt:
-        logger.info("Shutting down the server...")
-        grpc_server.stop(0)
-        logger.info("The server has stopped successfully")
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop_event.set)
+
+    await stop_event.wait()
+    logger.info("Shutting down the server...")
+    await grpc_server.stop(0)
+    executor.shutdown(wait=True)
+    flush_publication_notifications()
+    shutdown_dispatcher()
+    logger.info("The server has stopped successfully")
+
+
+def run_event_loop(main):
+    """
+    Runs a coroutine to completion, on uvloop when ``GRPC_UVLOOP`` is enabled.
+
+    Args:
+        main (coroutine): The coroutine to run.
+    """
+    if GRPC_UVLOOP:
+        try:
+            import uvloop  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            logger.warning("GRPC_UVLOOP is set but uvloop is not installed.")
+        else:
+            return uvloop.run(main)
+    return asyncio.run(main)
+
+
+def run_server_process():
+    """Runs one of several server processes sharing the same port."""
+    run_event_loop(serve(reuse_port=True))
+
+
+def serve_processes(num_processes):
+    """
+    Runs the server in several processes, each bound to the same port.
+
+    The processes are spawned rather than forked, so each one starts its own
+    gRPC runtime and background threads. Stop signals are forwarded to every
+    process.
+
+    Args:
+        num_processes (int): The number of server processes to run.
+    """
+    spawn = multiprocessing.get_context("spawn")
+    processes = [
+        spawn.Process(target=run_server_process, name=f"publisher-{index}")
+        for index in range(num_processes)
+    ]
+    for process in processes:
+        process.start()
+    logger.info("Started %d gRPC server processes", num_processes)
+
+    def stop_processes(signum, _frame):
+        for process in processes:
+            if process.is_alive():
+                os.kill(process.pid, signum)
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, stop_processes)
+
+    for process in processes:
+        process.join()
 
 
 if __name__ == "__main__":
-    serve()
+    grpc_processes = int(get_configs("GRPC_PROCESSES", default_value=1))
+    if grpc_processes > 1:
+        serve_processes(grpc_processes)
+    else:
+        run_event_loop(serve())
@@ -1,6 +1,8 @@
 """Vault gRPC Client"""
 
+import binascii
 import functools
+import threading
 import grpc
 
 import vault_pb2
@@ -11,6 +13,15 @@ from logutils import get_logger
 
 logger = get_logger(__name__)
 
+CHANNEL_OPTIONS = [
+    ("grpc.keepalive_time_ms", 60_000),
+    ("grpc.keepalive_timeout_ms", 20_000),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+_stubs = {}
+_stubs_lock = threading.Lock()
+
 
 def get_channel(internal=True):
     """Get the appropriate gRPC channel based on the mode.
@@ -35,11 +46,41 @@ def get_channel(internal=True):
         logger.info("Connecting to vault gRPC server at %s:%s", hostname, secure_port)
         credentials = grpc.ssl_channel_credentials()
         logger.info("Using secure channel for gRPC communication")
-        return grpc.secure_channel(f"{hostname}:{secure_port}", credentials)
+        return grpc.secure_channel(
+            f"{hostname}:{secure_port}", credentials, options=CHANNEL_OPTIONS
+        )
 
     logger.info("Connecting to vault gRPC server at %s:%s", hostname, port)
     logger.warning("Using insecure channel for gRPC communication")
-    return grpc.insecure_channel(f"{hostname}:{port}")
+    return grpc.insecure_channel(f"{hostname}:{port}", options=CHANNEL_OPTIONS)
+
+
+def get_stub(internal=True):
+    """Get a vault stub bound to a shared, long-lived channel.
+
+    Channels are created once per port and reused so each call does not pay
+    for a new HTTP/2 (and TLS) connection.
+
+    Args:
+        internal (bool, optional): Flag indicating whether to use internal ports.
+            Defaults to True.
+
+    Returns:
+        vault_pb2_grpc.EntityInternalStub | vault_pb2_grpc.EntityStub: The stub.
+    """
+    stub = _stubs.get(internal)
+    if stub is None:
+        with _stubs_lock:
+            stub = _stubs.get(internal)
+            if stub is None:
+                channel = get_channel(internal)
+                stub = (
+                    vault_pb2_grpc.EntityInternalStub(channel)
+                    if internal
+                    else vault_pb2_grpc.EntityStub(channel)
+                )
+                _stubs[internal] = stub
+    return stub
 
 
 def grpc_call(internal=True):
@@ -49,15 +90,8 @@ def grpc_call(internal=True):
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             try:
-                channel = get_channel(internal)
-
-                with channel as conn:
-                    kwargs["stub"] = (
-                        vault_pb2_grpc.EntityInternalStub(conn)
-                        if internal
-                        else vault_pb2_grpc.EntityStub(conn)
-                    )
-                    return func(*args, **kwargs)
+                kwargs["stub"] = get_stub(internal)
+                return func(*args, **kwargs)
             except grpc.RpcError as e:
                 return None, e
             except Exception as e:
@@ -177,7 +211,8 @@ def decrypt_payload(payload_ciphertext, **kwargs):
     Decrypts the payload.
 
     Args:
-        payload_ciphertext (bytes): The ciphertext of the payload to be decrypted.
+        payload_ciphertext (bytes): The raw ciphertext of the payload to be decrypted.
+            It is base64-encoded here, as the vault's request field is a string.
 
     Returns:
         tuple: A tuple containing:
@@ -188,6 +223,11 @@ def decrypt_payload(payload_ciphertext, **kwargs):
     device_id = kwargs.get("device_id")
     phone_number = kwargs.get("phone_number")
 
+    if isinstance(payload_ciphertext, (bytes, bytearray, memoryview)):
+        payload_ciphertext = binascii.b2a_base64(
+            payload_ciphertext, newline=False
+        ).decode("ascii")
+
     request = vault_pb2.DecryptPayloadRequest(
         device_id=device_id,
         payload_ciphertext=payload_ciphertext,
@@ -286,6 +326,43 @@ def update_entity_token(token, platform, account_identifier, **kwargs):
     return response, None
 
 
+@grpc_call()
+def update_entity_token_future(token, platform, account_identifier, **kwargs):
+    """Start an entity token update in the vault without waiting for it.
+
+    Args:
+        device_id (str): The ID of the device.
+        token (str): The token to store.
+        platform (str): The platform name.
+        account_identifier (str): The account identifier.
+
+    Returns:
+        tuple: A tuple containing:
+            - future (grpc.Future): Resolves to the vault server response.
+            - error (Exception): The error encountered if the request fails, otherwise None.
+    """
+    stub = kwargs["stub"]
+    device_id = kwargs.get("device_id")
+    phone_number = kwargs.get("phone_number")
+
+    request = vault_pb2.UpdateEntityTokenRequest(
+        device_id=device_id,
+        token=token,
+        platform=platform,
+        account_identifier=account_identifier,
+        phone_number=phone_number,
+    )
+
+    logger.debug(
+        "Starting background token update for platform '%s' using %s='%s'.",
+        platform,
+        "device_id" if device_id else "phone_number",
+        mask_sensitive_info(device_id or phone_number),
+    )
+
+    return stub.UpdateEntityToken.future(request), None
+
+
 @grpc_call()
 def delete_entity_token(long_lived_token, platform, account_identifier, **kwargs):
     """Delete an entity's token in the vault.
@@ -311,3 +388,30 @@ def delete_entity_token(long_lived_token, platform, account_identifier, **kwargs
     response = stub.DeleteEntityToken(request)
     logger.info("Successfully deleted token for platform '%s'", platform)
     return response, None
+
+
+@grpc_call()
+def delete_entity_token_future(
+    long_lived_token, platform, account_identifier, **kwargs
+):
+    """Start deleting an entity's token in the vault without waiting for it.
+
+    Args:
+        long_lived_token (str): The long-lived token used to authenticate
+        platform (str): The platform name.
+        account_identifier (str): The account identifier.
+
+    Returns:
+        tuple: A tuple containing:
+            - future (grpc.Future): Resolves to the vault server response.
+            - error (Exception): The error encountered if the request fails, otherwise None.
+    """
+    stub = kwargs["stub"]
+    request = vault_pb2.DeleteEntityTokenRequest(
+        long_lived_token=long_lived_token,
+        platform=platform,
+        account_identifier=account_identifier,
+    )
+
+    logger.debug("Starting background token deletion for platform '%s'", platform)
+    return stub.DeleteEntityToken.future(request), None
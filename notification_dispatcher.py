@@ -5,7 +5,6 @@ Public License was not distributed with this file, see <https://www.gnu.org/lice
 """
 
 import concurrent.futures
-import threading
 import sentry_sdk
 from logutils import get_logger
 from sms_outbound import (
@@ -14,10 +13,49 @@ from sms_outbound import (
     get_phonenumber_region_code,
     QUEUEDROID_SUPPORTED_REGION_CODES,
 )
-from publications import create_publication_entry
+from publications import create_publication_entry, create_publication_entries
 
 logger = get_logger(__name__)
 
+_executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="notification")
+
+
+def _log_failed_notification(future):
+    """Log the exception of a notification task that failed."""
+    if exc := future.exception():
+        logger.error(
+            "Failed to dispatch notification: %s",
+            exc,
+            exc_info=(type(exc), exc, exc.__traceback__),
+        )
+
+
+def store_publications(entries: list):
+    """Store publication events, falling back to one write per event.
+
+    A failed bulk insert is retried row by row, so one bad entry does not
+    drop the publication records of the whole batch.
+
+    Args:
+        entries (list[dict]): The details of each publication event.
+    """
+    try:
+        create_publication_entries(entries)
+        return
+    except Exception:
+        logger.exception("Failed to store %d publications at once.", len(entries))
+
+    for details in entries:
+        try:
+            create_publication_entry(**details)
+        except Exception:
+            logger.exception("Failed to store publication: %s", details)
+
+
+def shutdown_dispatcher():
+    """Wait for every submitted notification to finish and stop the executor."""
+    _executor.shutdown(wait=True)
+
 
 def send_sms_notification(phone_number: str, message: str):
     """Send an SMS notification.
@@ -66,7 +104,12 @@ def send_event(
 
 
 def dispatch_notifications(notifications: list):
-    """Dispatch multiple notifications concurrently using ThreadPoolExecutor.
+    """Dispatch multiple notifications concurrently on a shared ThreadPoolExecutor.
+
+    Notifications are submitted without waiting for them to be delivered.
+
+    When more than one publication event is present they are stored with a
+    single bulk insert instead of one write per event.
 
     Args:
         notifications (list): A list of notification dictionaries, each containing:
@@ -97,10 +140,25 @@ def dispatch_notifications(notifications: list):
             case _:
                 logger.error("Invalid notification type: %s", notification_type)
 
-    def _run_in_background():
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            for notification in notifications:
-                executor.submit(_dispatch, notification)
-
-    thread = threading.Thread(target=_run_in_background, daemon=True)
-    thread.start()
+    publication_details = []
+    other_notifications = []
+    for notification in notifications:
+        if (
+            notification.get("notification_type") == "event"
+            and notification.get("target") == "publication"
+        ):
+            publication_details.append(notification.get("details"))
+        else:
+            other_notifications.append(notification)
+
+    if len(publication_details) < 2:
+        publication_details, other_notifications = [], notifications
+
+    if publication_details:
+        _executor.submit(store_publications, publication_details).add_done_callback(
+            _log_failed_notification
+        )
+    for notification in other_notifications:
+        _executor.submit(_dispatch, notification).add_done_callback(
+            _log_failed_notification
+        )
@@ -4,21 +4,273 @@ of the GNU General Public License, v. 3.0. If a copy of the GNU General
 Public License was not distributed with this file, see <https://www.gnu.org/licenses/>.
 """
 
+import atexit
 import os
-import json
+import queue
+import select
+import struct
 import subprocess
+import threading
+import time
+import orjson
 from logutils import get_logger
+from utils import get_configs
 
 logger = get_logger(__name__)
 
+ADAPTER_WORKER_POOL_SIZE = int(
+    get_configs("ADAPTER_WORKER_POOL_SIZE", default_value="2")
+)
+ADAPTER_WORKER_IDLE_TIMEOUT = float(
+    get_configs("ADAPTER_WORKER_IDLE_TIMEOUT", default_value="600")
+)
+ADAPTER_INVOKE_TIMEOUT = 60
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "adapter_worker.py")
+
+_FRAME_HEADER = struct.Struct(">I")
+_RESULT_HEADER = struct.Struct(">iI")
+
+
+class AdapterWorker:
+    """
+    A long-lived adapter subprocess running ``adapter_worker.py``.
+    """
+
+    def __init__(self, python_exec, adapter_main_path, generation=0):
+        self.generation = generation
+        self.process = subprocess.Popen(
+            [python_exec, WORKER_SCRIPT, adapter_main_path],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            bufsize=0,
+        )
+        self.last_used = time.monotonic()
+        logger.info(
+            "Started adapter worker (pid %s) for %s",
+            self.process.pid,
+            os.path.basename(os.path.dirname(adapter_main_path)),
+        )
+
+    def is_alive(self):
+        """Return True if the worker process is still running."""
+        return self.process.poll() is None
+
+    def _read_exact(self, size, deadline):
+        fd = self.process.stdout.fileno()
+        chunks = []
+        while size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise subprocess.TimeoutExpired(self.process.args, 0)
+            chunk = os.read(fd, size)
+            if not chunk:
+                raise RuntimeError("Adapter worker exited unexpectedly.")
+            chunks.append(chunk)
+            size -= len(chunk)
+        return b"".join(chunks)
+
+    def send(self, payload):
+        """
+        Send a request frame to the worker.
+
+        Raises:
+            BrokenPipeError: If the worker is no longer reading requests.
+        """
+        data = memoryview(_FRAME_HEADER.pack(len(payload)) + payload)
+        fd = self.process.stdin.fileno()
+        while data:
+            data = data[os.write(fd, data) :]
+
+    def receive(self, timeout):
+        """
+        Wait for the worker's response frame.
+
+        Returns:
+            tuple: ``returncode``, ``stdout`` bytes and ``stderr`` bytes of
+                the adapter run.
+        """
+        deadline = time.monotonic() + timeout
+        (length,) = _FRAME_HEADER.unpack(self._read_exact(_FRAME_HEADER.size, deadline))
+        frame = self._read_exact(length, deadline)
+        self.last_used = time.monotonic()
+        returncode, stdout_length = _RESULT_HEADER.unpack_from(frame)
+        stdout_end = _RESULT_HEADER.size + stdout_length
+        return (
+            returncode,
+            frame[_RESULT_HEADER.size : stdout_end],
+            frame[stdout_end:],
+        )
+
+    def close(self):
+        """Terminate the worker process."""
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+        self.process.stdout.close()
+
 
 class AdapterIPCHandler:
     """
     Handles inter-process communication (IPC) with an adapter script using JSON over pipes.
+
+    Each call runs the adapter in a fresh subprocess. Adapters that set
+    ``persistent_worker = true`` in their manifest are instead served by a pool
+    of long-lived workers, so each call does not pay interpreter start-up and
+    import cost. A worker serves many callers in one interpreter, so such
+    adapters must not keep per-account state in module globals,
+    ``os.environ`` or the working directory. Setting
+    ``ADAPTER_WORKER_POOL_SIZE`` to 0 disables pooling for every adapter.
     """
 
+    _pools = {}
+    _pools_lock = threading.Lock()
+    _reaper = None
+    _generation = 0
+
+    @classmethod
+    def _get_pool(cls, python_exec, adapter_main_path):
+        key = (python_exec, adapter_main_path)
+        with cls._pools_lock:
+            pool = cls._pools.get(key)
+            if pool is None:
+                pool = cls._pools[key] = queue.LifoQueue()
+            if cls._reaper is None:
+                cls._reaper = threading.Thread(
+                    target=cls._reap_idle_workers,
+                    name="adapter-worker-reaper",
+                    daemon=True,
+                )
+                cls._reaper.start()
+        return pool
+
+    @classmethod
+    def _reap_idle_workers(cls):
+        """Periodically close workers idle for longer than the idle timeout."""
+        while True:
+            time.sleep(min(60, ADAPTER_WORKER_IDLE_TIMEOUT))
+            now = time.monotonic()
+            with cls._pools_lock:
+                pools = list(cls._pools.values())
+            for pool in pools:
+                keep = []
+                while True:
+                    try:
+                        worker = pool.get_nowait()
+                    except queue.Empty:
+                        break
+                    if now - worker.last_used > ADAPTER_WORKER_IDLE_TIMEOUT:
+                        logger.debug(
+                            "Closing idle adapter worker %s", worker.process.pid
+                        )
+                        worker.close()
+                    else:
+                        keep.append(worker)
+                for worker in reversed(keep):
+                    pool.put(worker)
+
+    @classmethod
+    def close_all(cls):
+        """
+        Close every pooled worker.
+
+        Workers keep running the adapter code they loaded at start-up, so this
+        is called whenever adapters change on disk. Workers busy with a call
+        are closed once the call returns instead of going back to the pool.
+        """
+        with cls._pools_lock:
+            cls._generation += 1
+            pools = list(cls._pools.values())
+        for pool in pools:
+            while True:
+                try:
+                    worker = pool.get_nowait()
+                except queue.Empty:
+                    break
+                worker.close()
+
+    @classmethod
+    def ensure_pool(cls, adapter_path, venv_path, size=None):
+        """
+        Pre-start idle workers for an adapter.
+
+        Args:
+            adapter_path (str): Path to the adapter script.
+            venv_path (str): Path to the virtual environment containing the Python executable.
+            size (int, optional): Number of workers to keep warm.
+                Defaults to ``ADAPTER_WORKER_POOL_SIZE``.
+        """
+        size = ADAPTER_WORKER_POOL_SIZE if size is None else size
+        python_exec = os.path.join(venv_path, "bin", "python3")
+        if size <= 0 or not os.path.isfile(python_exec):
+            return
+
+        adapter_main_path = os.path.join(adapter_path, "main.py")
+        pool = cls._get_pool(python_exec, adapter_main_path)
+        while pool.qsize() < size:
+            pool.put(AdapterWorker(python_exec, adapter_main_path, cls._generation))
+
+    @classmethod
+    def _run_in_worker(cls, python_exec, adapter_main_path, payload):
+        pool = cls._get_pool(python_exec, adapter_main_path)
+
+        worker = None
+        while worker is None:
+            try:
+                worker = pool.get_nowait()
+            except queue.Empty:
+                worker = AdapterWorker(python_exec, adapter_main_path, cls._generation)
+                break
+            if not worker.is_alive():
+                worker.close()
+                worker = None
+
+        try:
+            try:
+                worker.send(payload)
+            except BrokenPipeError:
+                # The request never reached the adapter, so it is safe to retry.
+                worker.close()
+                worker = AdapterWorker(python_exec, adapter_main_path, cls._generation)
+                worker.send(payload)
+
+            response = worker.receive(ADAPTER_INVOKE_TIMEOUT)
+        except BaseException:
+            worker.close()
+            raise
+
+        if worker.generation == cls._generation and pool.qsize() < max(
+            ADAPTER_WORKER_POOL_SIZE, 1
+        ):
+            pool.put(worker)
+        else:
+            worker.close()
+
+        return response
+
     @staticmethod
-    def invoke(adapter_path, venv_path, method, params=None):
+    def _run_in_subprocess(command, payload):
+        with subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        ) as process:
+            try:
+                stdout, stderr = process.communicate(
+                    input=payload, timeout=ADAPTER_INVOKE_TIMEOUT
+                )
+            except BaseException:
+                process.kill()
+                raise
+            return process.returncode, stdout, stderr
+
+    @classmethod
+    def invoke(
+        cls, adapter_path, venv_path, method, params=None, persistent_worker=False
+    ):
         """
         Invokes the adapter using JSON over pipes and subprocess IPC.
 
@@ -28,6 +280,8 @@ class AdapterIPCHandler:
             method (str): The method to invoke on the adapter.
             params (dict): Parameters to pass to the adapter method.
                 Defaults to an empty dictionary if None.
+            persistent_worker (bool): Whether the adapter opted into being
+                served by a pooled long-lived worker.
 
         Returns:
             dict: A dictionary containing 'result' and 'error' keys.
@@ -47,67 +301,58 @@ class AdapterIPCHandler:
         if not os.path.isfile(python_exec):
             raise FileNotFoundError(f"Python executable not found at: {python_exec}")
 
-        command = [python_exec, adapter_main_path]
-        payload = json.dumps({"method": method, "params": params or {}})
-        logger.debug("Command: %s", " ".join(command))
-        logger.info(
-            "Starting subprocess for: %s on %s", method, os.path.basename(adapter_path)
-        )
+        payload = orjson.dumps({"method": method, "params": params or {}})
+        logger.info("Dispatching: %s on %s", method, os.path.basename(adapter_path))
 
         try:
-            with subprocess.Popen(
-                command,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-            ) as process:
-                logger.info("Subprocess started for: %s", method)
-
-                stdout, stderr = process.communicate(input=payload, timeout=60)
-                logger.debug(
-                    "\n\n=========== SUBPROCESS STREAM OUTPUT ==========="
-                    "\n%s\n"
-                    "=========== SUBPROCESS STREAM OUTPUT ===========\n\n",
-                    stderr.strip(),
+            if persistent_worker and ADAPTER_WORKER_POOL_SIZE > 0:
+                returncode, stdout, stderr = cls._run_in_worker(
+                    python_exec, adapter_main_path, payload
                 )
-                logger.debug("Subprocess response: %s", stdout.strip())
-
-                if process.returncode != 0:
-                    logger.error(
-                        "Subprocess failed. Code: %s, Error: %s",
-                        process.returncode,
-                        stderr.strip(),
-                    )
-                    raise RuntimeError(
-                        f"Adapter subprocess exited with error:\n{stderr.strip()}"
-                    )
-
-                if not stdout.strip():
-                    logger.error("No response from adapter.")
-                    return {"result": None, "error": "No response from adapter."}
-
-                try:
-                    response = json.loads(stdout.strip())
-                except json.JSONDecodeError:
-                    logger.error("Invalid JSON: %s", stdout.strip())
-                    return {
-                        "result": None,
-                        "error": f"Invalid JSON from adapter: {stdout.strip()}",
-                    }
-                logger.info(
-                    "Completed: %s on %s", method, os.path.basename(adapter_path)
-                )
-                return {
-                    "result": response.get("result"),
-                    "error": response.get("error"),
-                }
-
+            else:
+                command = [python_exec, adapter_main_path]
+                logger.debug("Command: %s", " ".join(command))
+                returncode, stdout, stderr = cls._run_in_subprocess(command, payload)
         except subprocess.TimeoutExpired as exc:
-            process.kill()
             logger.error("Invocation timed out.")
             raise RuntimeError("Adapter invocation timed out.") from exc
-        except Exception:
-            process.kill()
-            raise
+
+        stdout = stdout.strip()
+        stderr = stderr.decode("utf-8", "replace").strip()
+        logger.debug(
+            "\n\n=========== SUBPROCESS STREAM OUTPUT ==========="
+            "\n%s\n"
+            "=========== SUBPROCESS STREAM OUTPUT ===========\n\n",
+            stderr,
+        )
+        logger.debug("Subprocess response: %s", stdout)
+
+        if returncode != 0:
+            logger.error(
+                "Subprocess failed. Code: %s, Error: %s",
+                returncode,
+                stderr,
+            )
+            raise RuntimeError(f"Adapter subprocess exited with error:\n{stderr}")
+
+        if not stdout:
+            logger.error("No response from adapter.")
+            return {"result": None, "error": "No response from adapter."}
+
+        try:
+            response = orjson.loads(stdout)
+        except orjson.JSONDecodeError:
+            stdout = stdout.decode("utf-8", "replace")
+            logger.error("Invalid JSON: %s", stdout)
+            return {
+                "result": None,
+                "error": f"Invalid JSON from adapter: {stdout}",
+            }
+        logger.info("Completed: %s on %s", method, os.path.basename(adapter_path))
+        return {
+            "result": response.get("result"),
+            "error": response.get("error"),
+        }
+
+
+atexit.register(AdapterIPCHandler.close_all)
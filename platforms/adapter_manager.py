@@ -10,12 +10,12 @@ import shutil
 import subprocess
 import configparser
 import hashlib
+import time
 from typing import Optional
-from git import Repo, RemoteProgress
-from tqdm import tqdm
 
 from logutils import get_logger
 from utils import get_configs
+from platforms.adapter_ipc_handler import AdapterIPCHandler
 
 BASE_DIR = os.path.dirname(__file__)
 adapters_dir = get_configs(
@@ -28,6 +28,9 @@ adapters_assets_dir = get_configs(
     "PLATFORMS_ADAPTERS_ASSETS_DIR",
     default_value=os.path.join(BASE_DIR, "adapters_assets"),
 )
+adapters_refresh_interval = float(
+    get_configs("PLATFORMS_ADAPTERS_REFRESH_INTERVAL", default_value="30")
+)
 
 logger = get_logger(__name__)
 
@@ -40,8 +43,12 @@ class AdapterManager:
     _adapters_dir = adapters_dir
     _adapters_venv_dir = adapters_venv_dir
     _adapters_assets_dir = adapters_assets_dir
+    _adapters_refresh_interval = adapters_refresh_interval
     _registry = {}
+    _shortcode_index = {}
     _cache_hash = None
+    _last_refresh = None
+    _lookup_cache = {}
 
     @classmethod
     def _calculate_directory_hash(cls) -> str:
@@ -105,10 +112,26 @@ class AdapterManager:
         return dict(config[section])
 
     @classmethod
-    def _populate_registry(cls):
+    def _populate_registry(cls, force: bool = False):
         """
         Populate the registry with adapter metadata if there are changes in the adapters directory.
+
+        The adapters directory is re-hashed at most once every
+        ``PLATFORMS_ADAPTERS_REFRESH_INTERVAL`` seconds unless ``force`` is set.
+
+        Args:
+            force (bool): Re-check the adapters directory regardless of the
+                refresh interval.
         """
+        now = time.monotonic()
+        if (
+            not force
+            and cls._last_refresh is not None
+            and now - cls._last_refresh < cls._adapters_refresh_interval
+        ):
+            return
+        cls._last_refresh = now
+
         if not os.path.isdir(cls._adapters_dir):
             logger.warning(
                 "Adapters directory '%s' does not exist. Creating it.",
@@ -120,7 +143,8 @@ class AdapterManager:
             logger.debug("Registry is up-to-date. No changes detected.")
             return
 
-        cls._registry.clear()
+        registry = {}
+        shortcode_index = {}
 
         for item in os.listdir(cls._adapters_dir):
             adapter_path = os.path.join(cls._adapters_dir, item)
@@ -140,8 +164,13 @@ class AdapterManager:
                 manifest_data["assets_path"] = os.path.join(
                     cls._adapters_assets_dir, adapter_dir_name
                 )
+                manifest_data["persistent_worker"] = (
+                    manifest_data.get("persistent_worker", "false").lower() == "true"
+                )
 
-                cls._registry[key] = manifest_data
+                registry[key] = manifest_data
+                if shortcode := manifest_data.get("shortcode"):
+                    shortcode_index.setdefault(shortcode, manifest_data)
                 logger.info(
                     "Registered adapter '%s' with protocol '%s' from '%s'",
                     adapter_name,
@@ -151,7 +180,13 @@ class AdapterManager:
             else:
                 logger.warning("Skipping invalid adapter directory: '%s'", adapter_path)
 
-        logger.info("Adapter registry populated with %d adapters.", len(cls._registry))
+        if cls._registry:
+            # Pooled workers still run the adapter code they started with.
+            AdapterIPCHandler.close_all()
+        cls._registry = registry
+        cls._shortcode_index = shortcode_index
+        cls._lookup_cache = {}
+        logger.info("Adapter registry populated with %d adapters.", len(registry))
 
     @staticmethod
     def _rollback_directory(path: str):
@@ -222,9 +257,9 @@ class AdapterManager:
         cls._populate_registry()
 
         if shortcode:
-            for manifest in cls._registry.values():
-                if manifest.get("shortcode") == shortcode:
-                    return manifest
+            manifest = cls._shortcode_index.get(shortcode)
+            if manifest:
+                return manifest
             logger.warning("Adapter with shortcode '%s' not found.", shortcode)
             return None
 
@@ -242,17 +277,26 @@ class AdapterManager:
 
         Returns:
             Optional[dict]: A dictionary containing the adapter path,
-                virtual environment path, and assets path, or None if not found.
+                virtual environment path, assets path and whether the adapter
+                opted into a persistent worker, or None if not found.
         """
         cls._populate_registry()
 
-        manifest = cls._registry.get(f"{name}_{protocol}".lower())
+        key = f"{name}_{protocol}".lower()
+        cached = cls._lookup_cache.get(key)
+        if cached:
+            return cached
+
+        manifest = cls._registry.get(key)
         if manifest:
-            return {
+            adapter_paths = {
                 "path": manifest.get("path"),
                 "venv_path": manifest.get("venv_path"),
                 "assets_path": manifest.get("assets_path"),
+                "persistent_worker": manifest.get("persistent_worker", False),
             }
+            cls._lookup_cache[key] = adapter_paths
+            return adapter_paths
 
         logger.warning(
             "Adapter with name '%s' and protocol '%s' not found.",
@@ -272,6 +316,11 @@ class AdapterManager:
         Raises:
             ValueError: If the adapter structure is invalid or dependencies fail to install.
         """
+        # Imported here so the gRPC and REST servers don't load GitPython/tqdm
+        # (or require a git executable) just to resolve adapters.
+        from git import Repo, RemoteProgress
+        from tqdm import tqdm
+
         os.makedirs(cls._adapters_dir, exist_ok=True)
 
         class CloneProgress(RemoteProgress):
@@ -346,6 +395,7 @@ class AdapterManager:
                 cls._rollback_directory(venv_path)
                 raise
 
+        cls._populate_registry(force=True)
         logger.info(
             "Adapter '%s' added successfully with protocol '%s'.",
             adapter_name,
@@ -363,7 +413,7 @@ class AdapterManager:
         Raises:
             ValueError: If the adapter does not exist.
         """
-        cls._populate_registry()
+        cls._populate_registry(force=True)
 
         manifest = cls._registry.get(name)
         if not manifest:
@@ -379,6 +429,7 @@ class AdapterManager:
         if os.path.exists(venv_path):
             cls._rollback_directory(venv_path)
 
+        cls._populate_registry(force=True)
         logger.info("Adapter '%s' removed successfully.", name)
 
     @classmethod
@@ -393,7 +444,9 @@ class AdapterManager:
         Raises:
             ValueError: If the adapter does not exist or update fails.
         """
-        cls._populate_registry()
+        from git import Repo
+
+        cls._populate_registry(force=True)
 
         adapters_to_update = (
             [cls._registry.get(name)] if name else cls._registry.values()
@@ -436,4 +489,5 @@ class AdapterManager:
                             f"Failed to reinstall dependencies for '{manifest.get('name')}'."
                         ) from e
 
+        cls._populate_registry(force=True)
         logger.info("Adapter update process completed.")
@@ -0,0 +1,131 @@
+"""
+This program is free software: you can redistribute it under the terms
+of the GNU General Public License, v. 3.0. If a copy of the GNU General
+Public License was not distributed with this file, see <https://www.gnu.org/licenses/>.
+
+Long-lived adapter worker.
+
+Runs inside an adapter's virtual environment and executes the adapter's
+``main.py`` once per request, without paying interpreter start-up,
+dependency import and compile cost every time. Unlike a one-shot
+subprocess, imported modules, ``os.environ`` and the working directory are
+shared by every request the worker serves, so it is only used for adapters
+that opt in through their manifest.
+
+Requests and responses are length-prefixed frames exchanged over the
+worker's stdin/stdout. A request frame holds the adapter's JSON input. A
+response frame holds the return code and stdout length, followed by the raw
+stdout and stderr bytes, so the adapter's output is passed through without
+being re-encoded. This module must only depend on the standard library.
+"""
+
+import io
+import os
+import struct
+import sys
+import traceback
+import types
+
+HEADER = struct.Struct(">I")
+RESULT_HEADER = struct.Struct(">iI")
+
+
+def read_frame(stream):
+    """Read a single length-prefixed frame, or None on EOF."""
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+    (length,) = HEADER.unpack(header)
+    return stream.read(length)
+
+
+def write_frame(stream, data):
+    """Write a single length-prefixed frame."""
+    stream.write(HEADER.pack(len(data)) + data)
+    stream.flush()
+
+
+def load_adapter(main_path):
+    """Compile the adapter's main.py once for reuse across requests."""
+    with open(main_path, "rb") as file:
+        return compile(file.read(), main_path, "exec")
+
+
+def run_adapter(main_path, code, payload):
+    """Run the adapter's compiled main.py with the ``payload`` bytes on stdin.
+
+    Each run gets a fresh ``__main__`` module, as ``runpy.run_path`` would.
+
+    Returns:
+        tuple: ``returncode``, ``stdout`` bytes and ``stderr`` bytes of the run.
+    """
+    stdin, stdout, stderr = sys.stdin, sys.stdout, sys.stderr
+    main_module = sys.modules["__main__"]
+    sys.stdin = io.TextIOWrapper(io.BytesIO(payload), encoding="utf-8")
+    sys.stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    sys.stderr = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    module = types.ModuleType("__main__")
+    module.__file__ = main_path
+    sys.modules["__main__"] = module
+    returncode = 0
+    try:
+        exec(code, module.__dict__)  # pylint: disable=exec-used
+    except SystemExit as exc:
+        if exc.code is None:
+            returncode = 0
+        elif isinstance(exc.code, int):
+            returncode = exc.code
+        else:
+            print(exc.code, file=sys.stderr)
+            returncode = 1
+    except BaseException:  # pylint: disable=broad-except
+        traceback.print_exc()
+        returncode = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        output = sys.stdout.buffer.getvalue()
+        errors = sys.stderr.buffer.getvalue()
+        sys.stdin, sys.stdout, sys.stderr = stdin, stdout, stderr
+        sys.modules["__main__"] = main_module
+
+    return returncode, output, errors
+
+
+def encode_result(returncode, output, errors):
+    """Encode an adapter run as a response frame body."""
+    return RESULT_HEADER.pack(returncode, len(output)) + output + errors
+
+
+def main():
+    """Serve adapter requests until stdin is closed."""
+    main_path = os.path.abspath(sys.argv[1])
+    sys.path[0] = os.path.dirname(main_path)
+
+    # Keep the protocol channel private so stray writes to fd 0/1 from the
+    # adapter or its native dependencies cannot corrupt the frame stream.
+    requests = os.fdopen(os.dup(0), "rb")
+    responses = os.fdopen(os.dup(1), "wb")
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, 0)
+    os.close(devnull)
+    os.dup2(2, 1)
+
+    try:
+        code, load_error = load_adapter(main_path), None
+    except Exception:  # pylint: disable=broad-except
+        code, load_error = None, traceback.format_exc()
+
+    while True:
+        frame = read_frame(requests)
+        if frame is None:
+            break
+        if code is None:
+            result = 1, b"", load_error.encode("utf-8")
+        else:
+            result = run_adapter(main_path, code, frame)
+        write_frame(responses, encode_result(*result))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Public License was not distributed with this file, see <https://www.gnu.org/lice
 
 from datetime import datetime
 from typing import Optional
+from peewee import Case, fn
 from db_models import Publications
 from logutils import get_logger
 
@@ -42,6 +43,23 @@ def create_publication_entry(
     return publication
 
 
+def create_publication_entries(entries):
+    """
+    Store multiple publication entries in a single transaction.
+
+    Args:
+        entries (list[dict]): Keyword arguments accepted by
+            :func:`create_publication_entry`, one dict per publication.
+    """
+    if not entries:
+        return
+
+    with Publications._meta.database.atomic():
+        Publications.insert_many(entries).execute()
+
+    logger.info("Successfully logged %d publications", len(entries))
+
+
 def fetch_publication(
     start_date: datetime.date,
     end_date: datetime.date,
@@ -67,9 +85,23 @@ def fetch_publication(
         if value:
             query = query.where(getattr(Publications, key) == value)
 
-    total_publications = query.count()
-    total_published = query.where(Publications.status == "published").count()
-    total_failed = query.where(Publications.status == "failed").count()
+    totals = (
+        query.select(
+            fn.COUNT(Publications.id).alias("total"),
+            fn.SUM(Case(None, [(Publications.status == "published", 1)], 0)).alias(
+                "published"
+            ),
+            fn.SUM(Case(None, [(Publications.status == "failed", 1)], 0)).alias(
+                "failed"
+            ),
+        )
+        .order_by()
+        .dicts()
+        .get()
+    )
+    total_publications = totals["total"]
+    total_published = totals["published"] or 0
+    total_failed = totals["failed"] or 0
 
     offset = (page - 1) * page_size
     paginated_query = query.limit(page_size).offset(offset)
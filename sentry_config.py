@@ -16,6 +16,7 @@ def initialize_sentry():
     sentry_sdk.init(
         dsn=get_configs("SENTRY_DSN"),
         server_name="Publisher",
+        sample_rate=float(get_configs("SENTRY_SAMPLE_RATE", default_value=1.0)),
         traces_sample_rate=float(
             get_configs("SENTRY_TRACES_SAMPLE_RATE", default_value=1.0)
         ),
@@ -4,6 +4,8 @@ of the GNU General Public License, v. 3.0. If a copy of the GNU General
 Public License was not distributed with this file, see <https://www.gnu.org/licenses/>.
 """
 
+import threading
+
 import requests
 import phonenumbers
 from phonenumbers import geocoder
@@ -26,6 +28,29 @@ QUEUEDROID_SUPPORTED_REGION_CODES = get_configs("QUEUEDROID_SUPPORTED_REGION_COD
 
 logger = get_logger(__name__)
 
+_queuedroid_session = requests.Session()
+_twilio_client = None
+_twilio_client_lock = threading.Lock()
+
+
+def get_twilio_client():
+    """Get a shared Twilio client.
+
+    The client is created on first use and reused so each message does not
+    open a new HTTPS connection to Twilio.
+
+    Returns:
+        Client: The Twilio REST client.
+    """
+    global _twilio_client  # pylint: disable=global-statement
+    client = _twilio_client
+    if client is None:
+        with _twilio_client_lock:
+            client = _twilio_client
+            if client is None:
+                client = _twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+    return client
+
 
 def send_with_twilio(phone_number: str, message: str) -> bool:
     """
@@ -38,7 +63,7 @@ def send_with_twilio(phone_number: str, message: str) -> bool:
     Returns:
         bool: True if the message was sent successfully, False otherwise.
     """
-    client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+    client = get_twilio_client()
 
     try:
         message_response = client.messages.create(
@@ -76,7 +101,7 @@ def send_with_queuedroid(phone_number: str, message: str) -> bool:
             "phone_number": phone_number,
         }
         headers = {"Authorization": f"Bearer {QUEUEDROID_API_KEY}"}
-        response = requests.post(
+        response = _queuedroid_session.post(
             QUEUEDROID_API_URL, json=data, headers=headers, timeout=10
         )
 
@@ -5,6 +5,8 @@ Public License was not distributed with this file, see <https://www.gnu.org/lice
 """
 
 import configparser
+import os
+import threading
 from datetime import datetime
 import grpc
 import pytest
@@ -14,6 +16,46 @@ from logutils import get_logger
 
 logger = get_logger(__name__)
 
+# Unit tests importing the service modules need a database; default to an
+# in-memory SQLite one unless the environment configures another.
+os.environ.setdefault("SQLITE_DATABASE_PATH", ":memory:")
+
+
+class CallRecorder:
+    """
+    Stands in for a function, recording the arguments of each call.
+
+    Calls return ``result``, raise it if it is an exception, or are passed
+    on to ``wraps`` when one is given. Safe to call from several threads.
+    """
+
+    def __init__(self, result=None, wraps=None):
+        self.result = result
+        self.wraps = wraps
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs):
+        with self.lock:
+            self.calls.append((args, kwargs))
+        if self.wraps is not None:
+            return self.wraps(*args, **kwargs)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.fixture
+def record_calls(monkeypatch):
+    """Factory fixture replacing an attribute with a CallRecorder."""
+
+    def _record_calls(target, name, result=None, wraps=None):
+        recorder = CallRecorder(result=result, wraps=wraps)
+        monkeypatch.setattr(target, name, recorder)
+        return recorder
+
+    return _record_calls
+
 
 def pytest_addoption(parser):
     """Adds the --env CLI argument for pytest."""
@@ -0,0 +1,198 @@
+"""
+This program is free software: you can redistribute it under the terms
+of the GNU General Public License, v. 3.0. If a copy of the GNU General
+Public License was not distributed with this file, see <https://www.gnu.org/licenses/>.
+"""
+
+import io
+import os
+import subprocess
+import sys
+import orjson
+import pytest
+
+from platforms import adapter_ipc_handler, adapter_worker
+from platforms.adapter_ipc_handler import AdapterIPCHandler, AdapterWorker
+
+ADAPTER_MAIN = """
+import json
+import os
+import sys
+import time
+
+request = json.load(sys.stdin)
+params = request["params"]
+if params.get("sleep"):
+    time.sleep(params["sleep"])
+if params.get("fail"):
+    print("adapter failed", file=sys.stderr)
+    sys.exit(3)
+print(json.dumps({"result": {"method": request["method"], "pid": os.getpid()}}))
+"""
+
+
+@pytest.fixture
+def adapter(tmp_path):
+    """
+    Creates an adapter directory and a virtual environment pointing at this interpreter.
+    """
+    adapter_path = tmp_path / "adapter"
+    adapter_path.mkdir()
+    (adapter_path / "main.py").write_text(ADAPTER_MAIN, encoding="utf-8")
+    venv_bin = tmp_path / "venv" / "bin"
+    venv_bin.mkdir(parents=True)
+    os.symlink(sys.executable, venv_bin / "python3")
+    return str(adapter_path), str(tmp_path / "venv")
+
+
+@pytest.fixture(autouse=True)
+def isolated_pools(monkeypatch):
+    """
+    Gives each test its own worker pools and closes them afterwards.
+    """
+    monkeypatch.setattr(AdapterIPCHandler, "_pools", {})
+    yield
+    AdapterIPCHandler.close_all()
+
+
+def run_in_worker(adapter, params):
+    """
+    Runs a request through the worker pool of the adapter.
+    """
+    adapter_path, venv_path = adapter
+    return AdapterIPCHandler._run_in_worker(
+        os.path.join(venv_path, "bin", "python3"),
+        os.path.join(adapter_path, "main.py"),
+        orjson.dumps({"method": "echo", "params": params}),
+    )
+
+
+def get_pool(adapter):
+    """
+    Returns the worker pool of the adapter.
+    """
+    adapter_path, venv_path = adapter
+    return AdapterIPCHandler._get_pool(
+        os.path.join(venv_path, "bin", "python3"),
+        os.path.join(adapter_path, "main.py"),
+    )
+
+
+def test_frame_round_trip():
+    """
+    Test that frames written by the worker are read back intact.
+    """
+    stream = io.BytesIO()
+    adapter_worker.write_frame(stream, b"first")
+    adapter_worker.write_frame(stream, b"")
+    stream.seek(0)
+
+    assert adapter_worker.read_frame(stream) == b"first"
+    assert adapter_worker.read_frame(stream) == b""
+    assert adapter_worker.read_frame(stream) is None
+
+
+def test_worker_result_frame(adapter):
+    """
+    Test that the return code, stdout and stderr survive the response frame.
+    """
+    returncode, stdout, stderr = run_in_worker(adapter, {"fail": True})
+    assert returncode == 3
+    assert stdout == b""
+    assert stderr == b"adapter failed\n"
+
+    returncode, stdout, stderr = run_in_worker(adapter, {})
+    assert returncode == 0
+    assert orjson.loads(stdout)["result"]["method"] == "echo"
+    assert stderr == b""
+
+
+def test_invoke_uses_worker_only_when_opted_in(adapter):
+    """
+    Test that only adapters opting into a persistent worker reuse a process.
+    """
+    adapter_path, venv_path = adapter
+
+    pids = {
+        AdapterIPCHandler.invoke(adapter_path, venv_path, "echo")["result"]["pid"]
+        for _ in range(2)
+    }
+    assert len(pids) == 2
+    assert not AdapterIPCHandler._pools
+
+    pids = {
+        AdapterIPCHandler.invoke(
+            adapter_path, venv_path, "echo", persistent_worker=True
+        )["result"]["pid"]
+        for _ in range(2)
+    }
+    assert len(pids) == 1
+    assert get_pool(adapter).qsize() == 1
+
+
+def test_worker_timeout_discards_worker(adapter, monkeypatch):
+    """
+    Test that a worker that times out is closed instead of being reused.
+    """
+    monkeypatch.setattr(adapter_ipc_handler, "ADAPTER_INVOKE_TIMEOUT", 0.2)
+    pool = get_pool(adapter)
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_in_worker(adapter, {"sleep": 5})
+
+    assert pool.qsize() == 0
+    returncode, _, _ = run_in_worker(adapter, {})
+    assert returncode == 0
+
+
+def test_broken_pipe_retries_on_new_worker(adapter):
+    """
+    Test that a request is retried on a new worker when the pooled one has died.
+    """
+    adapter_path, venv_path = adapter
+    dead = AdapterWorker(
+        os.path.join(venv_path, "bin", "python3"),
+        os.path.join(adapter_path, "main.py"),
+        AdapterIPCHandler._generation,
+    )
+    dead.process.kill()
+    dead.process.wait()
+    # Simulate the worker dying between the liveness check and the send.
+    dead.is_alive = lambda: True
+    pool = get_pool(adapter)
+    pool.put(dead)
+
+    returncode, stdout, _ = run_in_worker(adapter, {})
+
+    assert returncode == 0
+    pid = orjson.loads(stdout)["result"]["pid"]
+    assert pid != dead.process.pid
+    assert pool.get_nowait().process.pid == pid
+
+
+def test_close_all_retires_workers_by_generation(adapter):
+    """
+    Test that close_all() closes idle workers and retires busy ones after their call.
+    """
+    adapter_path, venv_path = adapter
+    run_in_worker(adapter, {})
+    pool = get_pool(adapter)
+    idle = pool.queue[0]
+
+    AdapterIPCHandler.close_all()
+
+    assert pool.qsize() == 0
+    assert idle.process.poll() is not None
+
+    stale = AdapterWorker(
+        os.path.join(venv_path, "bin", "python3"),
+        os.path.join(adapter_path, "main.py"),
+        AdapterIPCHandler._generation - 1,
+    )
+    pool.put(stale)
+
+    returncode, _, _ = run_in_worker(adapter, {})
+
+    assert returncode == 0
+    assert pool.qsize() == 0
+    assert stale.process.poll() is not None
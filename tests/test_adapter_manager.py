@@ -0,0 +1,68 @@
+"""
+This program is free software: you can redistribute it under the terms
+of the GNU General Public License, v. 3.0. If a copy of the GNU General
+Public License was not distributed with this file, see <https://www.gnu.org/licenses/>.
+"""
+
+import pytest
+
+from platforms.adapter_manager import AdapterManager
+
+
+def write_adapter(adapters_dir, name, protocol, extra=""):
+    """
+    Writes an adapter directory with a manifest.
+    """
+    adapter_path = adapters_dir / f"{name}_{protocol}"
+    adapter_path.mkdir()
+    (adapter_path / "manifest.ini").write_text(
+        f"[platform]\nname = {name}\nshortcode = {name[0]}\n"
+        f"protocol_type = {protocol}\n{extra}",
+        encoding="utf-8",
+    )
+    return adapter_path
+
+
+@pytest.fixture
+def adapters_dir(tmp_path, monkeypatch):
+    """
+    Points the AdapterManager at an empty adapters directory with a fresh registry.
+    """
+    path = tmp_path / "adapters"
+    path.mkdir()
+    monkeypatch.setattr(AdapterManager, "_adapters_dir", str(path))
+    monkeypatch.setattr(AdapterManager, "_adapters_venv_dir", str(tmp_path / "venvs"))
+    monkeypatch.setattr(AdapterManager, "_registry", {})
+    monkeypatch.setattr(AdapterManager, "_shortcode_index", {})
+    monkeypatch.setattr(AdapterManager, "_lookup_cache", {})
+    monkeypatch.setattr(AdapterManager, "_cache_hash", None)
+    monkeypatch.setattr(AdapterManager, "_last_refresh", None)
+    return path
+
+
+def test_persistent_worker_is_opt_in(adapters_dir):
+    """
+    Test that only adapters whose manifest sets persistent_worker use a pooled worker.
+    """
+    write_adapter(adapters_dir, "gmail", "oauth2", "persistent_worker = true\n")
+    write_adapter(adapters_dir, "telegram", "pnba")
+
+    assert AdapterManager.get_adapter_path("gmail", "oauth2")["persistent_worker"]
+    assert not AdapterManager.get_adapter_path("telegram", "pnba")["persistent_worker"]
+
+
+def test_remove_adapter_rescans_within_refresh_interval(adapters_dir, monkeypatch):
+    """
+    Test that removing an adapter does not act on a registry throttled by the refresh interval.
+    """
+    monkeypatch.setattr(AdapterManager, "_adapters_refresh_interval", 3600)
+    write_adapter(adapters_dir, "gmail", "oauth2")
+    assert AdapterManager.get_adapter_path("gmail", "oauth2")
+
+    telegram_path = write_adapter(adapters_dir, "telegram", "pnba")
+    AdapterManager.remove_adapter("telegram_pnba")
+
+    assert not telegram_path.exists()
+    assert AdapterManager.get_adapter_path("telegram", "pnba") is None
+    with pytest.raises(ValueError):
+        AdapterManager.remove_adapter("telegram_pnba")
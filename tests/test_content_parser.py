@@ -46,6 +46,12 @@ def test_decode_v0_valid(payload, expected):
     assert result == expected
 
 
+def test_decode_v0_negative_length():
+    result, error = decode_v0(struct.pack("<i", -1) + b"key")
+    assert result is None
+    assert isinstance(error, Exception)
+
+
 @pytest.mark.parametrize(
     "payload, expected",
     [
@@ -0,0 +1,134 @@
+"""
+This program is free software: you can redistribute it under the terms
+of the GNU General Public License, v. 3.0. If a copy of the GNU General
+Public License was not distributed with this file, see <https://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import os
+import grpc
+import pytest
+
+import grpc_server
+from grpc_publisher_service import RecordedStatusContext
+from grpc_server import CertificateReloader, LoggingInterceptor
+
+
+class RecordingLogger:
+    """
+    Records the level and arguments of each log call.
+    """
+
+    def __init__(self):
+        self.records = []
+
+    def info(self, msg, *args):
+        """Record an info message."""
+        self.records.append(("info", args))
+
+    def error(self, msg, *args):
+        """Record an error message."""
+        self.records.append(("error", args))
+
+
+@pytest.fixture
+def interceptor():
+    """
+    Provides a LoggingInterceptor that records its log calls.
+    """
+    logging_interceptor = LoggingInterceptor()
+    logging_interceptor.logger = RecordingLogger()
+    return logging_interceptor
+
+
+def test_stream_is_logged_after_it_ends(interceptor):
+    """
+    Test that a streaming RPC is logged once exhausted, with its final status.
+    """
+    context = RecordedStatusContext(None)
+
+    async def publish_stream(request_iterator, context):
+        yield "first"
+        context.set_details("Stream failed")
+        context.set_code(grpc.StatusCode.UNAVAILABLE)
+        yield "second"
+
+    async def consume():
+        responses = await interceptor.intercept(
+            publish_stream, None, context, "/Publisher/PublishContentStream"
+        )
+        received = []
+        async for response in responses:
+            received.append(response)
+            assert not interceptor.logger.records
+        return received
+
+    assert asyncio.run(consume()) == ["first", "second"]
+    assert interceptor.logger.records == [
+        ("error", ("/Publisher/PublishContentStream", "UNAVAILABLE"))
+    ]
+
+
+def test_failed_stream_is_logged_as_error(interceptor):
+    """
+    Test that a stream ending with an exception is not logged as OK.
+    """
+    context = RecordedStatusContext(None)
+
+    async def publish_stream(request_iterator, context):
+        yield "first"
+        raise RuntimeError("adapter crashed")
+
+    async def consume():
+        responses = await interceptor.intercept(
+            publish_stream, None, context, "/Publisher/PublishContentStream"
+        )
+        async for _ in responses:
+            pass
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(consume())
+    assert interceptor.logger.records == [
+        ("error", ("/Publisher/PublishContentStream", "UNKNOWN"))
+    ]
+
+
+def test_unary_call_is_logged(interceptor):
+    """
+    Test that a unary RPC is logged after its handler returns.
+    """
+    context = RecordedStatusContext(None)
+
+    async def publish(request, context):
+        return "published"
+
+    response = asyncio.run(
+        interceptor.intercept(publish, None, context, "/Publisher/PublishContent")
+    )
+
+    assert response == "published"
+    assert interceptor.logger.records == [("info", ("/Publisher/PublishContent",))]
+
+
+def test_certificate_files_are_checked_once_per_interval(tmp_path, record_calls):
+    """
+    Test that handshakes within the reload interval do not touch the filesystem.
+    """
+    certificate_path = tmp_path / "server.crt"
+    key_path = tmp_path / "server.key"
+    certificate_path.write_bytes(b"certificate")
+    key_path.write_bytes(b"key")
+    reloader = CertificateReloader(str(certificate_path), str(key_path))
+
+    certificate_path.write_bytes(b"renewed certificate")
+    os.utime(certificate_path, ns=(0, 0))
+    stat = record_calls(grpc_server.os, "stat", wraps=os.stat)
+
+    assert reloader() is None
+    assert reloader() is None
+    assert not stat.calls
+
+    # Let the reload interval elapse.
+    reloader.next_check = 0
+    assert reloader() is not None
+    assert stat.calls
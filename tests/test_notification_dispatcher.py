@@ -0,0 +1,158 @@
+"""
+This program is free software: you can redistribute it under the terms
+of the GNU General Public License, v. 3.0. If a copy of the GNU General
+Public License was not distributed with this file, see <https://www.gnu.org/licenses/>.
+"""
+
+from concurrent.futures import Future
+from types import SimpleNamespace
+import pytest
+
+import notification_dispatcher
+from db_models import Publications
+from notification_dispatcher import dispatch_notifications
+
+
+class ImmediateExecutor:
+    """Runs submitted calls straight away on the calling thread."""
+
+    def submit(self, fn, *args, **kwargs):
+        """Run ``fn`` with the given arguments and return its completed future."""
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as exc:  # pylint: disable=broad-except
+            future.set_exception(exc)
+        return future
+
+
+@pytest.fixture
+def calls(monkeypatch, record_calls):
+    """
+    Runs dispatches synchronously and records which insert path and SMS sends were used.
+    """
+    monkeypatch.setattr(notification_dispatcher, "_executor", ImmediateExecutor())
+    Publications.delete().execute()
+    return SimpleNamespace(
+        entry=record_calls(
+            notification_dispatcher,
+            "create_publication_entry",
+            wraps=notification_dispatcher.create_publication_entry,
+        ),
+        entries=record_calls(
+            notification_dispatcher,
+            "create_publication_entries",
+            wraps=notification_dispatcher.create_publication_entries,
+        ),
+        sms=record_calls(notification_dispatcher, "send_sms_notification"),
+    )
+
+
+def publication_event(platform_name):
+    """
+    Builds a publication event notification.
+    """
+    return {
+        "notification_type": "event",
+        "target": "publication",
+        "details": {
+            "platform_name": platform_name,
+            "source": "platforms",
+            "status": "published",
+            "country_code": "CM",
+        },
+    }
+
+
+def sms_sent(calls):
+    """
+    Returns the phone number and message of each SMS sent.
+    """
+    return [
+        (kwargs["phone_number"], kwargs["message"]) for _, kwargs in calls.sms.calls
+    ]
+
+
+def stored_platforms():
+    """
+    Returns the platform names of the stored publications.
+    """
+    return sorted(p.platform_name for p in Publications.select())
+
+
+def test_publication_events_are_bulk_inserted(calls):
+    """
+    Test that two or more publication events are stored with one bulk insert.
+    """
+    dispatch_notifications(
+        [
+            publication_event("gmail"),
+            {"notification_type": "sms", "target": "+237600000000", "message": "hi"},
+            publication_event("telegram"),
+        ]
+    )
+
+    assert [len(args[0]) for args, _ in calls.entries.calls] == [2]
+    assert not calls.entry.calls
+    assert sms_sent(calls) == [("+237600000000", "hi")]
+    assert stored_platforms() == ["gmail", "telegram"]
+
+
+def test_single_publication_event_is_dispatched_alone(calls):
+    """
+    Test that a lone publication event is stored through the per-event path.
+    """
+    dispatch_notifications(
+        [
+            publication_event("gmail"),
+            {"notification_type": "sms", "target": "+237600000000", "message": "hi"},
+        ]
+    )
+
+    assert not calls.entries.calls
+    assert len(calls.entry.calls) == 1
+    assert sms_sent(calls) == [("+237600000000", "hi")]
+    assert stored_platforms() == ["gmail"]
+
+
+def test_failed_bulk_insert_falls_back_to_one_write_per_event(calls, caplog):
+    """
+    Test that a failed bulk insert stores each event separately, logging the failures.
+    """
+    create_publication_entry = calls.entry.wraps
+
+    def create_entry(**details):
+        if details["platform_name"] == "broken":
+            raise ValueError("cannot store publication")
+        return create_publication_entry(**details)
+
+    calls.entries.wraps = None
+    calls.entries.result = ValueError("bulk insert failed")
+    calls.entry.wraps = create_entry
+
+    dispatch_notifications(
+        [
+            publication_event("gmail"),
+            publication_event("broken"),
+            publication_event("telegram"),
+        ]
+    )
+
+    assert len(calls.entries.calls) == 1
+    assert len(calls.entry.calls) == 3
+    assert stored_platforms() == ["gmail", "telegram"]
+    assert "Failed to store 3 publications at once." in caplog.text
+    assert "Failed to store publication" in caplog.text
+
+
+def test_failed_notification_is_logged(calls, caplog):
+    """
+    Test that an exception raised while sending a notification is logged.
+    """
+    calls.sms.result = RuntimeError("gateway unavailable")
+
+    dispatch_notifications(
+        [{"notification_type": "sms", "target": "+237600000000", "message": "hi"}]
+    )
+
+    assert "Failed to dispatch notification: gateway unavailable" in caplog.text
@@ -0,0 +1,187 @@
+"""
+This program is free software: you can redistribute it under the terms
+of the GNU General Public License, v. 3.0. If a copy of the GNU General
+Public License was not distributed with this file, see <https://www.gnu.org/licenses/>.
+"""
+
+import queue
+import threading
+import time
+import pytest
+
+import grpc_publisher_service
+from grpc_publisher_service import (
+    PublicationContext,
+    PublicationNotification,
+    dispatch_queued_notifications,
+    flush_publication_notifications,
+    handle_publication_notifications_batch,
+)
+from translations import Localization
+
+TEST_LOCALIZATION_DATA = """
+[en]
+sms_delivery_message = {delivery_status} to {platform_name} at {timestamp}.{additional_data}
+delivery_status_failed = Failed
+delivery_status_success = Sent
+
+[fr]
+sms_delivery_message = {delivery_status} vers {platform_name} à {timestamp}.{additional_data}
+delivery_status_success = Envoyé
+"""
+
+
+@pytest.fixture
+def dispatched(tmp_path, monkeypatch):
+    """
+    Captures each list of notifications handed to dispatch_notifications().
+    """
+    ini_path = tmp_path / "localization.ini"
+    ini_path.write_text(TEST_LOCALIZATION_DATA.strip(), encoding="utf-8")
+    monkeypatch.setattr(grpc_publisher_service, "loc", Localization(ini_path))
+    monkeypatch.setattr(grpc_publisher_service, "_DELIVERY_TEMPLATES", {})
+
+    batches = []
+    monkeypatch.setattr(
+        grpc_publisher_service, "dispatch_notifications", batches.append
+    )
+    return batches
+
+
+def make_notification(status="published", language="en", platform_name="gmail"):
+    """
+    Builds a publication outcome for the notification batch.
+    """
+    return PublicationNotification(
+        platform_name=platform_name,
+        publication_ctx=PublicationContext(country_code="CM", language=language),
+        status=status,
+        additional_data=None,
+        phone_number="+237600000000",
+        timestamp=0,
+    )
+
+
+def delivery_messages(notifications):
+    """
+    Returns the delivery messages among the dispatched notifications.
+    """
+    return [n["message"] for n in notifications if "message" in n]
+
+
+def test_missing_or_unknown_locale_falls_back_to_english(dispatched):
+    """
+    Test that locales missing a delivery key, or not available at all, use English.
+    """
+    handle_publication_notifications_batch(
+        [
+            make_notification(status="failed", language="fr"),
+            make_notification(status="failed", language="xx"),
+            make_notification(status="published", language="fr"),
+        ]
+    )
+
+    assert delivery_messages(dispatched[0]) == [
+        "Failed to gmail at 1970-01-01 00:00:00 (UTC).",
+        "Failed to gmail at 1970-01-01 00:00:00 (UTC).",
+        "Envoyé vers gmail à 1970-01-01 00:00:00 (UTC).",
+    ]
+
+
+def test_english_fallback_is_resolved_once(dispatched, caplog):
+    """
+    Test that the English fallback is cached so a missing key is only logged once.
+    """
+    for _ in range(3):
+        handle_publication_notifications_batch(
+            [make_notification(status="failed", language="fr")]
+        )
+
+    assert caplog.text.count("Falling back to English for 'fr'") == 1
+    assert [delivery_messages(batch) for batch in dispatched] == [
+        ["Failed to gmail at 1970-01-01 00:00:00 (UTC)."]
+    ] * 3
+
+
+def test_bad_item_does_not_drop_the_batch(dispatched):
+    """
+    Test that an item that cannot be built is skipped without losing the others.
+    """
+    handle_publication_notifications_batch(
+        [
+            make_notification(platform_name="gmail"),
+            make_notification()._replace(publication_ctx=None),
+            make_notification(platform_name="telegram"),
+        ]
+    )
+
+    (notifications,) = dispatched
+    assert [n["details"]["platform_name"] for n in notifications[::2]] == [
+        "gmail",
+        "telegram",
+    ]
+    assert delivery_messages(notifications) == [
+        "Sent to gmail at 1970-01-01 00:00:00 (UTC).",
+        "Sent to telegram at 1970-01-01 00:00:00 (UTC).",
+    ]
+
+
+def test_flush_dispatches_queued_notifications(dispatched, monkeypatch):
+    """
+    Test that flushing drains the queue in batches of NOTIFY_BATCH_SIZE.
+    """
+    notify_queue = queue.Queue()
+    monkeypatch.setattr(grpc_publisher_service, "_NOTIFY_Q", notify_queue)
+    monkeypatch.setattr(grpc_publisher_service, "NOTIFY_BATCH_SIZE", 2)
+    for platform_name in ("gmail", "telegram", "twitter"):
+        notify_queue.put(make_notification(platform_name=platform_name))
+
+    flush_publication_notifications()
+
+    assert notify_queue.empty()
+    assert [len(delivery_messages(batch)) for batch in dispatched] == [2, 1]
+    assert delivery_messages(dispatched[1]) == [
+        "Sent to twitter at 1970-01-01 00:00:00 (UTC)."
+    ]
+
+
+class NotifierLastLock:
+    """
+    Dispatch lock that the notifier thread only takes once a flush has released it.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flushed = threading.Event()
+        self.notifier = None
+
+    def __enter__(self):
+        if threading.current_thread() is self.notifier:
+            self.flushed.wait(timeout=5)
+        self.lock.acquire()
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+        if threading.current_thread() is not self.notifier:
+            self.flushed.set()
+
+
+def test_flush_waits_for_notification_taken_by_the_notifier(dispatched, monkeypatch):
+    """
+    Test that flushing waits for a notification the notifier took before the lock.
+    """
+    notify_queue = queue.Queue()
+    dispatch_lock = NotifierLastLock()
+    monkeypatch.setattr(grpc_publisher_service, "_NOTIFY_Q", notify_queue)
+    monkeypatch.setattr(grpc_publisher_service, "_NOTIFY_DISPATCH_LOCK", dispatch_lock)
+    notify_queue.put(make_notification())
+
+    dispatch_lock.notifier = threading.Thread(target=dispatch_queued_notifications)
+    dispatch_lock.notifier.start()
+    while not notify_queue.empty():
+        time.sleep(0.01)
+
+    flush_publication_notifications()
+
+    assert [len(delivery_messages(batch)) for batch in dispatched] == [1]
+    dispatch_lock.notifier.join(timeout=5)
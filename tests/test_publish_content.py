@@ -0,0 +1,220 @@
+"""
+This program is free software: you can redistribute it under the terms
+of the GNU General Public License, v. 3.0. If a copy of the GNU General
+Public License was not distributed with this file, see <https://www.gnu.org/licenses/>.
+"""
+
+import base64
+import queue
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import grpc
+import pytest
+from cachetools import TTLCache
+
+import publisher_pb2
+import grpc_publisher_service
+from grpc_publisher_service import PublisherService, RecordedStatusContext
+from platforms.adapter_ipc_handler import AdapterIPCHandler
+from platforms.adapter_manager import AdapterManager
+
+PLATFORM_INFO = {
+    "name": "telegram",
+    "shortcode": "t",
+    "protocol_type": "pnba",
+    "service_type": "message",
+}
+ADAPTER_PATHS = {
+    "path": "/adapters/telegram_pnba",
+    "venv_path": "/venvs/telegram_pnba",
+    "assets_path": "/assets/telegram_pnba",
+    "persistent_worker": False,
+}
+
+
+def make_content(ciphertext=b"ciphertext", device_id=b"\x01\x02"):
+    """
+    Builds a v0 payload for the telegram platform.
+    """
+    payload = struct.pack("<i", len(ciphertext)) + b"t" + ciphertext + device_id
+    return base64.b64encode(payload).decode("ascii")
+
+
+def make_request(content, sender="+237600000000"):
+    """
+    Builds a PublishContent request from a sender.
+    """
+    return publisher_pb2.PublishContentRequest(
+        content=content, metadata={"From": sender}
+    )
+
+
+DECRYPTED_PAYLOAD = SimpleNamespace(
+    success=True,
+    payload_plaintext=base64.b64encode(b"me:@friend:hello").decode(),
+    country_code="CM",
+    message="",
+)
+
+
+@pytest.fixture
+def calls(monkeypatch, record_calls):
+    """
+    Stubs the vault and the adapter, recording decryptions and adapter invocations.
+    """
+    monkeypatch.setattr(
+        grpc_publisher_service,
+        "_PUBLISH_IDEMPOTENCY",
+        TTLCache(maxsize=16, ttl=grpc_publisher_service.PUBLISH_IDEMPOTENCY_TTL),
+    )
+    monkeypatch.setattr(grpc_publisher_service, "_NOTIFY_Q", queue.Queue())
+    monkeypatch.setattr(AdapterManager, "get_adapter", lambda shortcode: PLATFORM_INFO)
+    monkeypatch.setattr(
+        AdapterManager, "get_adapter_path", lambda name, protocol: ADAPTER_PATHS
+    )
+    record_calls(
+        grpc_publisher_service,
+        "get_entity_access_token",
+        result=(SimpleNamespace(success=True, token='"+2376"'), None),
+    )
+    return SimpleNamespace(
+        decrypt=record_calls(
+            grpc_publisher_service, "decrypt_payload", result=(DECRYPTED_PAYLOAD, None)
+        ),
+        invoke=record_calls(AdapterIPCHandler, "invoke", result={"result": {}}),
+    )
+
+
+def publish(request):
+    """
+    Runs PublishContent and returns the response with the status it recorded.
+    """
+    context = RecordedStatusContext(None)
+    return PublisherService().PublishContent(request, context), context
+
+
+def test_replay_returns_cached_response(calls):
+    """
+    Test that a replayed request is answered from the cache without decrypting or publishing.
+    """
+    request = make_request(make_content())
+
+    first, _ = publish(request)
+    replay, context = publish(request)
+
+    assert first.success
+    assert replay == first
+    assert context.code() is None
+    assert len(calls.decrypt.calls) == 1
+    assert len(calls.invoke.calls) == 1
+
+    message = replay.message
+    replay.message = "changed by a caller"
+    assert publish(request)[0].message == message
+
+
+def test_failed_publication_is_not_cached(calls):
+    """
+    Test that a request whose publication failed is published again when retried.
+    """
+    calls.invoke.result = {"error": "Adapter unavailable"}
+    request = make_request(make_content())
+
+    failed, context = publish(request)
+    assert not failed.success
+    assert context.details() == "Adapter unavailable"
+
+    calls.invoke.result = {"result": {}}
+    retried, context = publish(request)
+
+    assert retried.success
+    assert context.code() is None
+    assert len(calls.decrypt.calls) == 2
+    assert len(calls.invoke.calls) == 2
+
+
+def test_same_content_from_another_sender_is_published(calls):
+    """
+    Test that identical content sent by different senders is not deduplicated.
+    """
+    content = make_content()
+
+    first, _ = publish(make_request(content, sender="+237600000000"))
+    second, _ = publish(make_request(content, sender="+237611111111"))
+
+    assert first.success
+    assert second.success
+    assert len(calls.decrypt.calls) == 2
+    assert len(calls.invoke.calls) == 2
+
+
+def test_request_without_sender_is_rejected(calls):
+    """
+    Test that a request without a From number is rejected before any vault call.
+    """
+    request = publisher_pb2.PublishContentRequest(content=make_content())
+
+    rejected, context = publish(request)
+
+    assert not rejected.success
+    assert context.code() == grpc.StatusCode.INVALID_ARGUMENT
+    assert context.details() == "Missing required field: metadata.From"
+    assert len(calls.decrypt.calls) == 0
+    assert not calls.invoke.calls
+
+
+def publish_concurrently(calls, request, first_outcome):
+    """
+    Publishes a request twice, sending the second while the first is publishing.
+    """
+    publishing = threading.Event()
+    release = threading.Event()
+
+    def invoke(**kwargs):
+        if not publishing.is_set():
+            publishing.set()
+            release.wait(timeout=5)
+            return first_outcome
+        return {"result": {}}
+
+    calls.invoke.wraps = invoke
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(publish, request)
+        assert publishing.wait(timeout=5)
+        second = executor.submit(publish, request)
+        # Give the duplicate time to reach the in-flight publication.
+        time.sleep(0.1)
+        release.set()
+        return first.result()[0], second.result()[0]
+
+
+def test_concurrent_duplicate_waits_for_the_first_publication(calls):
+    """
+    Test that a duplicate sent mid-publication gets its response instead of publishing.
+    """
+    first, second = publish_concurrently(
+        calls, make_request(make_content()), {"result": {}}
+    )
+
+    assert first.success
+    assert second == first
+    assert second is not first
+    assert len(calls.decrypt.calls) == 1
+    assert len(calls.invoke.calls) == 1
+
+
+def test_concurrent_duplicate_publishes_when_the_first_fails(calls):
+    """
+    Test that a duplicate waiting on a publication that fails publishes itself.
+    """
+    first, second = publish_concurrently(
+        calls, make_request(make_content()), {"error": "Adapter unavailable"}
+    )
+
+    assert not first.success
+    assert second.success
+    assert len(calls.decrypt.calls) == 2
+    assert len(calls.invoke.calls) == 2
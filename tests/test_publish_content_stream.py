@@ -0,0 +1,200 @@
+"""
+This program is free software: you can redistribute it under the terms
+of the GNU General Public License, v. 3.0. If a copy of the GNU General
+Public License was not distributed with this file, see <https://www.gnu.org/licenses/>.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import grpc
+import pytest
+
+import publisher_pb2
+import grpc_publisher_service
+from grpc_publisher_service import (
+    AsyncPublisherService,
+    PublisherService,
+    RecordedStatusContext,
+)
+
+
+class FakePublisherService(PublisherService):
+    """
+    Publishes requests whose content is "ok", "fail" or "wait", recording concurrency.
+    """
+
+    def __init__(self, hold_first=False):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.completed = []
+        self.hold_first = hold_first
+        self.second_done = threading.Event()
+        self.release = threading.Event()
+
+    def PublishContent(self, request, context):
+        index, outcome = request.content.split(":")
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+
+        if self.hold_first and index == "0":
+            # Let the second request finish first.
+            self.second_done.wait(timeout=5)
+        elif outcome == "wait":
+            self.release.wait(timeout=5)
+        else:
+            time.sleep(0.05)
+
+        with self.lock:
+            self.running -= 1
+            self.completed.append(index)
+        if index == "1":
+            self.second_done.set()
+
+        if outcome == "fail":
+            context.set_details(f"Publication {index} failed")
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            return publisher_pb2.PublishContentResponse()
+        return publisher_pb2.PublishContentResponse(
+            success=True, message=f"Published {index}"
+        )
+
+
+def make_requests(*outcomes):
+    """
+    Builds one request per outcome, numbered in order.
+    """
+    return [
+        publisher_pb2.PublishContentRequest(content=f"{index}:{outcome}")
+        for index, outcome in enumerate(outcomes)
+    ]
+
+
+def stream_async(service, requests):
+    """
+    Runs AsyncPublisherService.PublishContentStream and returns its responses.
+    """
+
+    async def request_iterator():
+        for request in requests:
+            yield request
+
+    async def collect():
+        async_service = AsyncPublisherService(service=service, executor=executor)
+        return [
+            response
+            async for response in async_service.PublishContentStream(
+                request_iterator(), context
+            )
+        ]
+
+    context = RecordedStatusContext(None)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = asyncio.run(collect())
+    return responses, context
+
+
+def messages(responses):
+    """
+    Returns the success flag and message of each response.
+    """
+    return [(response.success, response.message) for response in responses]
+
+
+def test_sync_stream_reports_item_errors_in_order():
+    """
+    Test that a failed item yields an error response without ending the stream.
+    """
+    service = FakePublisherService()
+    context = RecordedStatusContext(None)
+
+    responses = list(
+        service.PublishContentStream(iter(make_requests("ok", "fail", "ok")), context)
+    )
+
+    assert messages(responses) == [
+        (True, "Published 0"),
+        (False, "Publication 1 failed"),
+        (True, "Published 2"),
+    ]
+    assert context.code() is None
+
+
+def test_async_stream_keeps_request_order():
+    """
+    Test that responses follow request order when later requests finish first.
+    """
+    service = FakePublisherService(hold_first=True)
+
+    responses, _ = stream_async(service, make_requests("ok", "ok", "ok"))
+
+    assert service.completed.index("1") < service.completed.index("0")
+    assert messages(responses) == [
+        (True, "Published 0"),
+        (True, "Published 1"),
+        (True, "Published 2"),
+    ]
+
+
+def test_async_stream_bounds_requests_in_flight(monkeypatch):
+    """
+    Test that no more than STREAM_MAX_IN_FLIGHT requests are handled at once.
+    """
+    monkeypatch.setattr(grpc_publisher_service, "STREAM_MAX_IN_FLIGHT", 2)
+    service = FakePublisherService()
+
+    responses, _ = stream_async(service, make_requests(*["ok"] * 6))
+
+    assert len(responses) == 6
+    assert service.max_running == 2
+
+
+@pytest.mark.parametrize("failing", [0, 2])
+def test_async_stream_reports_item_errors(failing):
+    """
+    Test that a failed item yields an error response and the stream carries on.
+    """
+    outcomes = ["ok"] * 3
+    outcomes[failing] = "fail"
+
+    responses, context = stream_async(FakePublisherService(), make_requests(*outcomes))
+
+    expected = [(True, f"Published {index}") for index in range(3)]
+    expected[failing] = (False, f"Publication {failing} failed")
+    assert messages(responses) == expected
+    assert context.code() is None
+
+
+def test_async_stream_cancels_queued_requests_when_closed(monkeypatch):
+    """
+    Test that requests not yet started are cancelled when the client goes away.
+    """
+    monkeypatch.setattr(grpc_publisher_service, "STREAM_MAX_IN_FLIGHT", 3)
+    service = FakePublisherService()
+    requests = make_requests("ok", "wait", "ok", "ok")
+
+    async def request_iterator():
+        for request in requests:
+            yield request
+
+    async def receive_first():
+        async_service = AsyncPublisherService(service=service, executor=executor)
+        responses = async_service.PublishContentStream(
+            request_iterator(), RecordedStatusContext(None)
+        )
+        first = await responses.__anext__()
+        await responses.aclose()
+        # Keep the loop running, as a server would, while the worker frees up.
+        service.release.set()
+        await asyncio.sleep(0.3)
+        return first
+
+    # A single worker keeps the requests after the waiting one queued.
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first = asyncio.run(receive_first())
+
+    assert messages([first]) == [(True, "Published 0")]
+    assert service.completed == ["0", "1"]
@@ -18,6 +18,7 @@ farewell = Au revoir, à bientôt.
 
 [de]
 greeting = Hallo, willkommen!
+multiline = Erste Zeile\\nZweite Zeile
 """
 
 
@@ -137,3 +138,42 @@ def test_translation_falls_back_to_default_on_invalid_locale(localization):
         localization.set_locale("es")
 
     assert localization.translate("greeting") == "Hello, welcome!"
+
+
+def test_get_compiled_uses_explicit_locale(localization):
+    """
+    Test that get_compiled() reads the requested locale without changing the active one.
+    """
+    assert localization.get_compiled("greeting", "fr") == "Bonjour, bienvenue !"
+    assert localization.locale_code == "en"
+    assert localization.get_compiled("greeting") == "Hello, welcome!"
+
+
+def test_get_compiled_expands_escaped_newlines(localization):
+    """
+    Test that get_compiled() replaces literal '\\n' sequences with newlines.
+    """
+    assert localization.get_compiled("multiline", "de") == "Erste Zeile\nZweite Zeile"
+
+
+def test_get_compiled_invalid_locale_and_key(localization):
+    """
+    Test get_compiled() error handling for unknown locales and keys.
+    """
+    with pytest.raises(ValueError, match="Localization for 'es' is not available"):
+        localization.get_compiled("greeting", "es")
+
+    with pytest.raises(
+        KeyError, match="Translation key 'farewell' is missing under the 'de' locale"
+    ):
+        localization.get_compiled("farewell", "de")
+
+
+def test_preload_compiles_all_locales(localization):
+    """
+    Test that preload() compiles every key of every locale into the cache.
+    """
+    localization.preload()
+    assert localization._compiled[("de", "multiline")] == "Erste Zeile\nZweite Zeile"
+    assert localization._compiled[("fr", "farewell")] == "Au revoir, à bientôt."
+    assert localization.get_compiled("greeting", "fr") == "Bonjour, bienvenue !"
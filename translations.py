@@ -22,6 +22,7 @@ class Localization:
         self.file_path = file_path or os.path.join("configs", "localization.ini")
         self.config = self._load_config()
         self.locale_code = None
+        self._compiled = {}
         self.set_locale(default_locale)
 
     def _load_config(self):
@@ -74,3 +75,58 @@ class Localization:
             )
 
         return self.config.get(self.locale_code, key)
+
+    def preload(self):
+        """
+        Compile every translation of every locale up front.
+
+        Subsequent :meth:`get_compiled` calls are then plain cache lookups,
+        including the first one for each locale.
+        """
+        for locale_code in self.config.sections():
+            for key, value in self.config.items(locale_code):
+                self._compiled[(locale_code, key)] = value.replace("\\n", "\n")
+
+    def get_compiled(self, key, locale_code=None):
+        """
+        Retrieve a translation ready for formatting, with escaped newlines expanded.
+
+        Unlike :meth:`translate`, the locale can be passed explicitly so callers
+        on different threads do not depend on the shared active locale. Results
+        are cached per locale and key.
+
+        Args:
+            key (str): The translation key.
+            locale_code (str, optional): The language code to use. Defaults to
+                the active locale.
+
+        Returns:
+            str: The translated string with literal ``\\n`` replaced by newlines.
+
+        Raises:
+            ValueError: If the specified locale is not available.
+            KeyError: If the key is not found in the specified locale section.
+        """
+        locale_code = locale_code or self.locale_code
+        compiled = self._compiled.get((locale_code, key))
+        if compiled is not None:
+            return compiled
+
+        if locale_code is None:
+            raise RuntimeError("Locale is not set. Call set_locale() first.")
+
+        if locale_code not in self.config:
+            available_locales = ", ".join(self.config.sections())
+            raise ValueError(
+                f"Localization for '{locale_code}' is not available. "
+                f"Available options: {available_locales}"
+            )
+
+        if not self.config.has_option(locale_code, key):
+            raise KeyError(
+                f"Translation key '{key}' is missing under the '{locale_code}' locale."
+            )
+
+        compiled = self.config.get(locale_code, key).replace("\\n", "\n")
+        self._compiled[(locale_code, key)] = compiled
+        return compiled